@@ -152,9 +152,15 @@ async def get_leitner_review(
     # Eagerly load answers
     from app.models.leitner import LeitnerSessionAnswer
     result = await db.execute(
-        select(LeitnerSessionAnswer).where(LeitnerSessionAnswer.session_id == sid)
+        select(
+            LeitnerSessionAnswer.question_id,
+            LeitnerSessionAnswer.is_correct,
+            LeitnerSessionAnswer.previous_box,
+            LeitnerSessionAnswer.new_box
+        )
+        .where(LeitnerSessionAnswer.session_id == sid)
     )
-    answers = list(result.scalars().all())
+    answers = result.all()
     
     total = session.correct_answers + session.wrong_answers
     accuracy = round((session.correct_answers / total * 100), 2) if total > 0 else 0
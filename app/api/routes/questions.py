@@ -56,11 +56,15 @@ def _question_to_response(question) -> dict:
 @router.get("/quizzes/{quizId}/questions")
 async def get_questions(
     quizId: str,
+    lite: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all questions for a quiz (teacher only)."""
-    questions = await question_service.get_questions_by_quiz(db, quizId, current_user)
+    """Get all questions for a quiz (teacher only); `lite` skips options, pairs, zones and text config."""
+    if lite:
+        questions = await question_service.get_questions_by_quiz_lite(db, quizId, current_user)
+    else:
+        questions = await question_service.get_questions_by_quiz(db, quizId, current_user)
     return [_question_to_response(q) for q in questions]
 
 
@@ -77,6 +81,19 @@ async def create_question(
     return _question_to_response(question)
 
 
+@router.post("/quizzes/{quizId}/questions/bulk", status_code=status.HTTP_201_CREATED)
+async def create_questions_bulk(
+    quizId: str,
+    data: List[QuestionCreateDto],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create several questions at once."""
+    items = [item.model_dump(by_alias=False) for item in data]
+    questions = await question_service.create_questions_bulk(db, quizId, items, current_user)
+    return [_question_to_response(q) for q in questions]
+
+
 @router.get("/questions/{questionId}")
 async def get_question(
     questionId: str,
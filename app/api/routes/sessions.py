@@ -9,7 +9,7 @@ from typing import Optional
 from app.db.session import get_db
 from app.api.deps import get_current_user, get_current_student
 from app.models.user import User
-from app.models.session import QuizSession, SessionAnswer
+from app.models.session import QuizSession
 from app.schemas.session import (
     GameSessionStartDto, SubmitAnswerDto, AnswerResultDto,
     SessionResultDto, SessionReviewDto
@@ -138,12 +138,6 @@ async def get_session_review(
     """Get session review with corrections."""
     session = await session_service.get_session_review(db, sessionId, current_user)
     
-    # Eagerly load answers
-    result = await db.execute(
-        select(SessionAnswer).where(SessionAnswer.session_id == sessionId)
-    )
-    answers = list(result.scalars().all())
-    
     return {
         "sessionId": session.id,
         "totalScore": session.total_score,
@@ -153,5 +147,5 @@ async def get_session_review(
             "questionId": a.question_id,
             "isCorrect": a.is_correct,
             "answerData": a.answer_data
-        } for a in answers]
+        } for a in session.answers]
     }
@@ -0,0 +1,69 @@
+"""
+In-process cache for read-heavy statistics.
+"""
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+_WRITE_FLAG = "stats_cache_dirty"
+
+
+class TTLCache:
+    """Dict-backed cache whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value; a TTL of 0 disables caching."""
+        if self.ttl_seconds > 0:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+
+stats_cache = TTLCache(settings.STATS_CACHE_TTL_SECONDS)
+
+
+# Any committed write may change a leaderboard, dashboard or student stats, so the
+# cache is cleared after each commit that flushed objects or ran INSERT/UPDATE/DELETE.
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session, flush_context):
+    session.info[_WRITE_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WRITE_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_after_write(session):
+    if session.info.pop(_WRITE_FLAG, False):
+        stats_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_write_flag(session):
+    session.info.pop(_WRITE_FLAG, None)
@@ -14,6 +14,15 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./duobingo.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 512
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 512
+    
+    # Cache
+    STATS_CACHE_TTL_SECONDS: int = 30
     
     # JWT
     # WARNING: Change JWT_SECRET_KEY in production! Set via environment variable.
@@ -1,9 +1,50 @@
 """Database session management."""
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+
+def _engine_options(url: str) -> dict:
+    """Build engine options with a connection pool sized for concurrent requests."""
+    options = {"echo": settings.DEBUG}
+    
+    # In-memory SQLite must keep its single-connection pool
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        return options
+    
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    
+    if url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool (a new connection per session)
+        options["poolclass"] = AsyncAdaptedQueuePool
+    elif "+asyncpg" in url:
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    
+    return options
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Make SQLite enforce foreign keys so ON DELETE CASCADE applies."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+
+# Only the application engine: other SQLite engines in the process keep their own settings
+if engine.dialect.name == "sqlite":
+    event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
@@ -0,0 +1,41 @@
+"""In-place schema upgrades for databases created before a model change."""
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+from app.models.leitner import LeitnerBox
+
+
+def upgrade_schema(connection: Connection):
+    """
+    Bring an existing schema up to date with the models.
+
+    create_all only creates missing tables, never indexes on tables that already
+    exist, so indexes added to an existing table are created here. Every step
+    checks the current schema first and is safe to run on each startup.
+    """
+    _add_leitner_box_indexes(connection)
+
+
+def _add_leitner_box_indexes(connection: Connection):
+    """Create the leitner_boxes indexes, dropping duplicate boxes that block the unique one."""
+    existing = {index["name"] for index in inspect(connection).get_indexes(LeitnerBox.__tablename__)}
+    missing = [index for index in LeitnerBox.__table__.indexes if index.name not in existing]
+    if not missing:
+        return
+
+    if any(index.unique for index in missing):
+        # Keep one box per (student, classroom, question): the most advanced one
+        ranked = select(
+            LeitnerBox.id,
+            func.row_number().over(
+                partition_by=(LeitnerBox.student_id, LeitnerBox.classroom_id, LeitnerBox.question_id),
+                order_by=(LeitnerBox.box_level.desc(), LeitnerBox.id)
+            ).label("rank")
+        ).subquery()
+        connection.execute(
+            delete(LeitnerBox).where(LeitnerBox.id.in_(select(ranked.c.id).where(ranked.c.rank > 1)))
+        )
+
+    for index in missing:
+        connection.execute(CreateIndex(index, if_not_exists=True))
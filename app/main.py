@@ -6,7 +6,9 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.responses import ORJSONResponse
 from app.db.session import engine, Base
+from app.db.upgrade import upgrade_schema
 from app.api.routes import (
     auth,
     classrooms,
@@ -24,9 +26,10 @@ from app.api.routes import (
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup: Create database tables
+    # Startup: Create database tables, then upgrade tables that already existed
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
     
     yield
     
@@ -39,6 +42,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -1,7 +1,8 @@
 """Leitner system models."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Boolean, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -23,8 +24,14 @@ class LeitnerBox(Base):
     student = relationship("User", back_populates="leitner_boxes", foreign_keys=[student_id])
     question = relationship("Question", back_populates="leitner_boxes")
 
-    # Composite unique constraint
+    # Composite unique constraint and covering index for per-student lookups
     __table_args__ = (
+        Index(
+            "ix_leitner_box_student_classroom_question",
+            "student_id", "classroom_id", "question_id",
+            unique=True
+        ),
+        Index("ix_leitner_box_student_classroom_level", "student_id", "classroom_id", "box_level"),
         {'sqlite_autoincrement': True},
     )
 
@@ -62,8 +69,8 @@ class LeitnerSessionAnswer(Base):
     new_box = Column(Integer, nullable=False)
     answered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
-    # Store the answer data as JSON text (for review)
-    answer_data = Column(Text, nullable=True)
+    # Store the answer data as native JSON (JSONB on PostgreSQL) for review
+    answer_data = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
 
     # Relationships
     session = relationship("LeitnerSession", back_populates="answers")
@@ -33,15 +33,15 @@ class Question(Base):
     media = relationship("Media", foreign_keys=[media_id])
     
     # Polymorphic relationships
-    options = relationship("QuestionOption", back_populates="question", cascade="all, delete-orphan")
-    matching_pairs = relationship("MatchingPair", back_populates="question", cascade="all, delete-orphan")
-    image_zones = relationship("ImageZone", back_populates="question", cascade="all, delete-orphan")
-    text_config = relationship("TextConfig", back_populates="question", uselist=False, cascade="all, delete-orphan")
+    options = relationship("QuestionOption", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    matching_pairs = relationship("MatchingPair", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    image_zones = relationship("ImageZone", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    text_config = relationship("TextConfig", back_populates="question", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     
     # Answers
-    session_answers = relationship("SessionAnswer", back_populates="question", cascade="all, delete-orphan")
-    leitner_boxes = relationship("LeitnerBox", back_populates="question", cascade="all, delete-orphan")
-    leitner_session_answers = relationship("LeitnerSessionAnswer", back_populates="question", cascade="all, delete-orphan")
+    session_answers = relationship("SessionAnswer", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    leitner_boxes = relationship("LeitnerBox", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    leitner_session_answers = relationship("LeitnerSessionAnswer", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class QuestionOption(Base):
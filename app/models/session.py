@@ -2,7 +2,8 @@
 import uuid
 from datetime import datetime
 import enum
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Enum, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Enum, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -46,8 +47,8 @@ class SessionAnswer(Base):
     is_correct = Column(Boolean, nullable=False)
     answered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
-    # Store the answer data as JSON text (for review)
-    answer_data = Column(Text, nullable=True)
+    # Store the answer data as native JSON (JSONB on PostgreSQL) for review
+    answer_data = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
 
     # Relationships
     session = relationship("QuizSession", back_populates="answers")
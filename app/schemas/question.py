@@ -1,7 +1,8 @@
-from typing import Literal, Optional
+from typing import Annotated, Literal, Optional, Union
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic_core import PydanticCustomError
 
 
 class OptionDto(BaseModel):
@@ -36,10 +37,9 @@ class TextConfigDto(BaseModel):
     ignore_spelling_errors: Optional[bool] = Field(False, alias="ignoreSpellingErrors")
 
 
-class QuestionCreateDto(BaseModel):
+class _QuestionCreateBase(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
-    type: Literal["QCM", "VRAI_FAUX", "MATCHING", "IMAGE", "TEXT"] = Field(..., alias="type")
     content_text: str = Field(..., alias="contentText")
     explanation: Optional[str] = Field(None, alias="explanation")
     media_id: Optional[str] = Field(None, alias="mediaId")
@@ -49,6 +49,58 @@ class QuestionCreateDto(BaseModel):
     text_config: Optional[TextConfigDto] = Field(None, alias="textConfig")
 
 
+class QcmQuestionCreateDto(_QuestionCreateBase):
+    type: Literal["QCM"] = Field(..., alias="type")
+    options: list[OptionDto] = Field(..., alias="options", min_length=1)
+
+    @field_validator("options")
+    @classmethod
+    def require_correct_option(cls, options: list[OptionDto]) -> list[OptionDto]:
+        if not any(o.is_correct for o in options):
+            raise PydanticCustomError("qcm_correct_option", "QCM questions require at least one correct option")
+        return options
+
+
+class VraiFauxQuestionCreateDto(_QuestionCreateBase):
+    type: Literal["VRAI_FAUX"] = Field(..., alias="type")
+    options: list[OptionDto] = Field(..., alias="options", min_length=2, max_length=2)
+
+
+class MatchingQuestionCreateDto(_QuestionCreateBase):
+    type: Literal["MATCHING"] = Field(..., alias="type")
+    matching_pairs: list[MatchingPairDto] = Field(..., alias="matchingPairs", min_length=2)
+
+
+class TextQuestionCreateDto(_QuestionCreateBase):
+    type: Literal["TEXT"] = Field(..., alias="type")
+    text_config: TextConfigDto = Field(..., alias="textConfig")
+
+    @field_validator("text_config")
+    @classmethod
+    def require_accepted_answer(cls, text_config: TextConfigDto) -> TextConfigDto:
+        if not text_config.accepted_answer:
+            raise PydanticCustomError("text_accepted_answer", "TEXT questions require textConfig with acceptedAnswer")
+        return text_config
+
+
+class ImageQuestionCreateDto(_QuestionCreateBase):
+    type: Literal["IMAGE"] = Field(..., alias="type")
+    media_id: str = Field(..., alias="mediaId", min_length=1)
+    image_zones: list[ImageZoneDto] = Field(..., alias="imageZones", min_length=1)
+
+
+QuestionCreateDto = Annotated[
+    Union[
+        QcmQuestionCreateDto,
+        VraiFauxQuestionCreateDto,
+        MatchingQuestionCreateDto,
+        TextQuestionCreateDto,
+        ImageQuestionCreateDto,
+    ],
+    Field(discriminator="type"),
+]
+
+
 class QuestionResponseDto(BaseModel):
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
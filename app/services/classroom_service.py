@@ -3,7 +3,7 @@ import random
 import string
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, exists
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
@@ -227,6 +227,7 @@ async def add_teacher(db: AsyncSession, classroom_id: str, teacher_email: str, u
     classroom_teacher = ClassroomTeacher(classroom_id=classroom_id, teacher_id=teacher.id)
     db.add(classroom_teacher)
     await db.commit()
+    invalidate_membership_cache(db, classroom_id, teacher.id)
     
     # Reload with eager loading
     result = await db.execute(
@@ -259,6 +260,7 @@ async def remove_teacher(db: AsyncSession, classroom_id: str, teacher_id: str, u
     
     await db.delete(classroom_teacher)
     await db.commit()
+    invalidate_membership_cache(db, classroom_id, teacher_id)
 
 
 async def enroll_student(db: AsyncSession, classroom_id: str, student_email: str, user: User):
@@ -288,6 +290,7 @@ async def enroll_student(db: AsyncSession, classroom_id: str, student_email: str
     classroom_student = ClassroomStudent(classroom_id=classroom_id, student_id=student.id)
     db.add(classroom_student)
     await db.commit()
+    invalidate_membership_cache(db, classroom_id, student.id)
 
 
 async def remove_student(db: AsyncSession, classroom_id: str, student_id: str, user: User):
@@ -337,6 +340,7 @@ async def remove_student(db: AsyncSession, classroom_id: str, student_id: str, u
         
         await db.delete(classroom_student)
         await db.commit()
+        invalidate_membership_cache(db, classroom_id, student_id)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -373,6 +377,7 @@ async def join_classroom(db: AsyncSession, classroom_id: str, code: str, user: U
     classroom_student = ClassroomStudent(classroom_id=classroom_id, student_id=user.id)
     db.add(classroom_student)
     await db.commit()
+    invalidate_membership_cache(db, classroom_id, user.id)
     
     # Reload with eager loading
     result = await db.execute(
@@ -408,6 +413,7 @@ async def join_classroom_by_code(db: AsyncSession, code: str, user: User) -> Cla
     classroom_student = ClassroomStudent(classroom_id=classroom.id, student_id=user.id)
     db.add(classroom_student)
     await db.commit()
+    invalidate_membership_cache(db, classroom.id, user.id)
     
     # Reload with eager loading
     result = await db.execute(
@@ -476,46 +482,68 @@ async def get_classroom_members(db: AsyncSession, classroom_id: str, user: User)
 
 
 async def is_classroom_member(db: AsyncSession, classroom_id: str, user_id: str) -> bool:
-    """Check if user is a member of the classroom."""
-    result = await db.execute(select(Classroom).where(Classroom.id == classroom_id))
-    classroom = result.scalar_one_or_none()
-    
-    if not classroom:
-        return False
+    """Check if user is a member of the classroom (memoized for the request's session)."""
+    key = _member_cache_key(classroom_id, user_id)
+    if key in db.info:
+        return db.info[key]
     
-    if classroom.responsible_professor_id == user_id:
-        return True
+    result = await db.execute(select(classroom_member_condition(classroom_id, user_id)))
+    is_member = bool(result.scalar())
     
-    result = await db.execute(
-        select(ClassroomTeacher)
-        .where(ClassroomTeacher.classroom_id == classroom_id, ClassroomTeacher.teacher_id == user_id)
+    db.info[key] = is_member
+    return is_member
+
+
+def classroom_teacher_condition(classroom_id, user_id: str):
+    """SQL condition true when the user teaches the classroom (usable inside a larger query)."""
+    return or_(
+        exists().where(Classroom.id == classroom_id, Classroom.responsible_professor_id == user_id),
+        exists().where(ClassroomTeacher.classroom_id == classroom_id, ClassroomTeacher.teacher_id == user_id)
     )
-    if result.scalar_one_or_none():
-        return True
-    
-    result = await db.execute(
-        select(ClassroomStudent)
-        .where(ClassroomStudent.classroom_id == classroom_id, ClassroomStudent.student_id == user_id)
+
+
+def classroom_member_condition(classroom_id, user_id: str):
+    """SQL condition true when the user teaches or studies in the classroom."""
+    return or_(
+        classroom_teacher_condition(classroom_id, user_id),
+        exists().where(ClassroomStudent.classroom_id == classroom_id, ClassroomStudent.student_id == user_id)
     )
-    return result.scalar_one_or_none() is not None
 
 
-async def is_classroom_teacher(db: AsyncSession, classroom_id: str, user_id: str) -> bool:
-    """Check if user is a teacher in the classroom."""
-    result = await db.execute(select(Classroom).where(Classroom.id == classroom_id))
-    classroom = result.scalar_one_or_none()
-    
-    if not classroom:
-        return False
-    
+def is_classroom_teacher_loaded(classroom: Classroom, user_id: str) -> bool:
+    """Check if user is a teacher of a classroom whose teachers are already loaded."""
     if classroom.responsible_professor_id == user_id:
         return True
+    return any(t.teacher_id == user_id for t in classroom.teachers)
+
+
+def _teacher_cache_key(classroom_id: str, user_id: str) -> str:
+    """Key of a teacher-membership result in the session's request-scoped cache."""
+    return f"teacher:{classroom_id}:{user_id}"
+
+
+def _member_cache_key(classroom_id: str, user_id: str) -> str:
+    """Key of a classroom-membership result in the session's request-scoped cache."""
+    return f"member:{classroom_id}:{user_id}"
+
+
+def invalidate_membership_cache(db: AsyncSession, classroom_id: str, user_id: str):
+    """Drop cached membership results after a user joined or left the classroom."""
+    db.info.pop(_teacher_cache_key(classroom_id, user_id), None)
+    db.info.pop(_member_cache_key(classroom_id, user_id), None)
+
+
+async def is_classroom_teacher(db: AsyncSession, classroom_id: str, user_id: str) -> bool:
+    """Check if user is a teacher in the classroom (memoized for the request's session)."""
+    key = _teacher_cache_key(classroom_id, user_id)
+    if key in db.info:
+        return db.info[key]
     
-    result = await db.execute(
-        select(ClassroomTeacher)
-        .where(ClassroomTeacher.classroom_id == classroom_id, ClassroomTeacher.teacher_id == user_id)
-    )
-    return result.scalar_one_or_none() is not None
+    result = await db.execute(select(classroom_teacher_condition(classroom_id, user_id)))
+    is_teacher = bool(result.scalar())
+    
+    db.info[key] = is_teacher
+    return is_teacher
 
 
 async def is_responsible_professor(db: AsyncSession, classroom_id: str, user_id: str) -> bool:
@@ -1,12 +1,13 @@
 """Leitner box service for spaced repetition."""
-import json
 import random
-from datetime import datetime
+from functools import lru_cache
+from datetime import datetime, timezone
 from typing import List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, update, func, case, lambda_stmt, and_, exists, Row
 from fastapi import HTTPException, status
 
+from app.models.classroom import ClassroomStudent
 from app.models.leitner import LeitnerBox, LeitnerSession, LeitnerSessionAnswer
 from app.models.question import Question
 from app.models.user import User
@@ -25,23 +26,63 @@ BOX_PROBABILITIES = {
 
 VALID_QUESTION_COUNTS = [5, 10, 15, 20]
 
+BOX_LEVELS = (1, 2, 3, 4, 5)
+
+
+def _session_by_id_stmt(session_id: str):
+    """Cached statement fetching a Leitner session by primary key."""
+    return lambda_stmt(lambda: select(LeitnerSession).where(LeitnerSession.id == session_id))
+
+
+def _answer_context_stmt(session_id: str, classroom_id: str, student_id: str, question_id: str):
+    """Cached statement fetching the question, its Leitner box and the already-answered flag at once."""
+    return lambda_stmt(
+        lambda: select(
+            Question,
+            LeitnerBox,
+            exists().where(
+                LeitnerSessionAnswer.session_id == session_id,
+                LeitnerSessionAnswer.question_id == question_id
+            )
+        )
+        .outerjoin(
+            LeitnerBox,
+            and_(
+                LeitnerBox.question_id == Question.id,
+                LeitnerBox.classroom_id == classroom_id,
+                LeitnerBox.student_id == student_id
+            )
+        )
+        .where(Question.id == question_id)
+    )
+
 
 async def get_leitner_status(db: AsyncSession, classroom_id: str, user: User) -> Dict[str, int]:
     """Get the distribution of questions across Leitner boxes."""
-    if not await is_classroom_member(db, classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
-    
+    # Boxes only count while the student is still enrolled; enrolment is checked in the same query
     result = await db.execute(
         select(LeitnerBox.box_level, func.count(LeitnerBox.id))
+        .join(
+            ClassroomStudent,
+            and_(
+                ClassroomStudent.classroom_id == LeitnerBox.classroom_id,
+                ClassroomStudent.student_id == LeitnerBox.student_id
+            )
+        )
         .where(
             LeitnerBox.classroom_id == classroom_id,
             LeitnerBox.student_id == user.id
         )
         .group_by(LeitnerBox.box_level)
     )
+    rows = result.all()
+    
+    # No rows: either a member with empty boxes or not a member at all
+    if not rows and not await is_classroom_member(db, classroom_id, user.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
     distribution = {i: 0 for i in range(1, 6)}
-    for box_level, count in result.all():
+    for box_level, count in rows:
         distribution[box_level] = count
     
     return distribution
@@ -109,16 +150,18 @@ async def start_leitner_session(
     for box in selected_boxes:
         distribution[box.box_level] = distribution.get(box.box_level, 0) + 1
     
-    # Create session
-    session = LeitnerSession(
-        classroom_id=classroom_id,
-        student_id=user.id,
-        question_count=question_count
+    # Create session (INSERT ... RETURNING avoids a refresh round-trip)
+    result = await db.execute(
+        insert(LeitnerSession)
+        .values(
+            classroom_id=classroom_id,
+            student_id=user.id,
+            question_count=question_count
+        )
+        .returning(LeitnerSession)
     )
-    
-    db.add(session)
+    session = result.scalar_one()
     await db.commit()
-    await db.refresh(session)
     
     return session, selected_questions, distribution
 
@@ -131,7 +174,7 @@ async def submit_leitner_answer(
     user: User
 ) -> bool:
     """Submit an answer in a Leitner session."""
-    result = await db.execute(select(LeitnerSession).where(LeitnerSession.id == session_id))
+    result = await db.execute(_session_by_id_stmt(session_id))
     session = result.scalar_one_or_none()
     
     if not session:
@@ -146,34 +189,19 @@ async def submit_leitner_answer(
             detail="SESSION_ALREADY_FINISHED"
         )
     
-    # Check if already answered
+    # Fetch question, current box and duplicate-answer flag in one round-trip
     result = await db.execute(
-        select(LeitnerSessionAnswer)
-        .where(
-            LeitnerSessionAnswer.session_id == session_id,
-            LeitnerSessionAnswer.question_id == question_id
-        )
+        _answer_context_stmt(session_id, session.classroom_id, user.id, question_id)
     )
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Question already answered")
+    row = result.first()
     
-    # Get question
-    result = await db.execute(select(Question).where(Question.id == question_id))
-    question = result.scalar_one_or_none()
+    if row and row[2]:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Question already answered")
     
-    if not question:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     
-    # Get current box level
-    result = await db.execute(
-        select(LeitnerBox)
-        .where(
-            LeitnerBox.classroom_id == session.classroom_id,
-            LeitnerBox.student_id == user.id,
-            LeitnerBox.question_id == question_id
-        )
-    )
-    leitner_box = result.scalar_one_or_none()
+    question, leitner_box, _ = row
     
     if not leitner_box:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not in Leitner boxes")
@@ -195,7 +223,7 @@ async def submit_leitner_answer(
         is_correct=is_correct,
         previous_box=previous_box,
         new_box=new_box,
-        answer_data=json.dumps(answer_data)
+        answer_data=answer_data
     )
     
     db.add(answer)
@@ -206,7 +234,7 @@ async def submit_leitner_answer(
 
 async def finish_leitner_session(db: AsyncSession, session_id: str, user: User) -> LeitnerSession:
     """Finish a Leitner session and update box levels."""
-    result = await db.execute(select(LeitnerSession).where(LeitnerSession.id == session_id))
+    result = await db.execute(_session_by_id_stmt(session_id))
     session = result.scalar_one_or_none()
     
     if not session:
@@ -221,49 +249,56 @@ async def finish_leitner_session(db: AsyncSession, session_id: str, user: User)
             detail="SESSION_ALREADY_FINISHED"
         )
     
-    # Get all answers
+    # One timestamp for the whole completion (naive UTC, like the DateTime columns)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    # Aggregate answer statistics in SQL (only answers whose box still exists)
+    answered_box = and_(
+        LeitnerBox.classroom_id == session.classroom_id,
+        LeitnerBox.student_id == user.id,
+        LeitnerBox.question_id == LeitnerSessionAnswer.question_id
+    )
     result = await db.execute(
-        select(LeitnerSessionAnswer)
+        select(
+            func.coalesce(func.sum(case((LeitnerSessionAnswer.is_correct, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((LeitnerSessionAnswer.is_correct, 0), else_=1)), 0),
+            func.coalesce(func.sum(case((LeitnerSessionAnswer.new_box > LeitnerSessionAnswer.previous_box, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((LeitnerSessionAnswer.new_box < LeitnerSessionAnswer.previous_box, 1), else_=0)), 0),
+        )
+        .join(LeitnerBox, answered_box)
         .where(LeitnerSessionAnswer.session_id == session_id)
     )
-    answers = list(result.scalars().all())
-    
-    # Update box levels and calculate stats
-    promoted = 0
-    demoted = 0
-    correct_count = 0
-    wrong_count = 0
-    
-    for answer in answers:
-        result = await db.execute(
-            select(LeitnerBox)
-            .where(
-                LeitnerBox.classroom_id == session.classroom_id,
-                LeitnerBox.student_id == user.id,
-                LeitnerBox.question_id == answer.question_id
+    correct_count, wrong_count, promoted, demoted = result.one()
+    
+    # Move every answered box to its new level in one statement
+    new_box = (
+        select(LeitnerSessionAnswer.new_box)
+        .where(
+            LeitnerSessionAnswer.session_id == session_id,
+            LeitnerSessionAnswer.question_id == LeitnerBox.question_id
+        )
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(LeitnerBox)
+        .where(
+            LeitnerBox.classroom_id == session.classroom_id,
+            LeitnerBox.student_id == user.id,
+            LeitnerBox.question_id.in_(
+                select(LeitnerSessionAnswer.question_id)
+                .where(LeitnerSessionAnswer.session_id == session_id)
             )
         )
-        leitner_box = result.scalar_one_or_none()
-        
-        if leitner_box:
-            leitner_box.box_level = answer.new_box
-            leitner_box.last_reviewed_at = datetime.utcnow()
-            
-            if answer.is_correct:
-                correct_count += 1
-                if answer.new_box > answer.previous_box:
-                    promoted += 1
-            else:
-                wrong_count += 1
-                if answer.new_box < answer.previous_box:
-                    demoted += 1
+        .values(box_level=new_box, last_reviewed_at=now)
+        .execution_options(synchronize_session=False)
+    )
     
     # Update session
     session.correct_answers = correct_count
     session.wrong_answers = wrong_count
     session.promoted = promoted
     session.demoted = demoted
-    session.completed_at = datetime.utcnow()
+    session.completed_at = now
     
     await db.commit()
     await db.refresh(session)
@@ -271,10 +306,23 @@ async def finish_leitner_session(db: AsyncSession, session_id: str, user: User)
     return session
 
 
-async def get_leitner_review(db: AsyncSession, session_id: str, user: User) -> LeitnerSession:
+async def get_leitner_review(db: AsyncSession, session_id: str, user: User) -> Row:
     """Get Leitner session review with corrections."""
-    result = await db.execute(select(LeitnerSession).where(LeitnerSession.id == session_id))
-    session = result.scalar_one_or_none()
+    # Read-only: fetch plain column rows instead of hydrating a LeitnerSession
+    result = await db.execute(
+        select(
+            LeitnerSession.id,
+            LeitnerSession.classroom_id,
+            LeitnerSession.student_id,
+            LeitnerSession.correct_answers,
+            LeitnerSession.wrong_answers,
+            LeitnerSession.promoted,
+            LeitnerSession.demoted,
+            LeitnerSession.completed_at
+        )
+        .where(LeitnerSession.id == session_id)
+    )
+    session = result.one_or_none()
     
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SESSION_NOT_FOUND")
@@ -291,41 +339,39 @@ async def get_leitner_review(db: AsyncSession, session_id: str, user: User) -> L
     return session
 
 
+@lru_cache(maxsize=1024)
+def _quota(count: int, available: tuple) -> tuple:
+    """Compute how many questions to draw from each box (levels 1-5)."""
+    # Calculate target counts per box
+    targets = [
+        min(int(count * BOX_PROBABILITIES[level]), available[level - 1])
+        for level in BOX_LEVELS
+    ]
+    
+    # If we selected less than requested, try to fill from lower boxes
+    remaining = count - sum(targets)
+    for i in range(len(targets)):
+        if remaining <= 0:
+            break
+        to_add = min(remaining, available[i] - targets[i])
+        targets[i] += to_add
+        remaining -= to_add
+    
+    return tuple(targets)
+
+
 def _select_questions_by_probability(boxes_by_level: Dict[int, List[LeitnerBox]], count: int) -> List[LeitnerBox]:
     """Select questions based on box probabilities."""
-    # Count available questions per box
-    available_counts = {level: len(boxes) for level, boxes in boxes_by_level.items()}
-    total_available = sum(available_counts.values())
+    available = tuple(len(boxes_by_level[level]) for level in BOX_LEVELS)
     
-    if total_available == 0:
+    if sum(available) == 0:
         return []
     
-    # Calculate target counts per box
-    target_counts = {}
-    for level, prob in BOX_PROBABILITIES.items():
-        target = int(count * prob)
-        available = available_counts[level]
-        target_counts[level] = min(target, available)
-    
-    # Adjust if we don't have enough questions
-    total_selected = sum(target_counts.values())
-    
-    # If we selected less than requested, try to fill from lower boxes
-    if total_selected < count:
-        remaining = count - total_selected
-        for level in [1, 2, 3, 4, 5]:
-            available = available_counts[level] - target_counts[level]
-            to_add = min(remaining, available)
-            target_counts[level] += to_add
-            remaining -= to_add
-            if remaining == 0:
-                break
-    
     # Select random questions from each box
     selected = []
-    for level, target in target_counts.items():
-        if target > 0 and boxes_by_level[level]:
-            selected.extend(random.sample(boxes_by_level[level], min(target, len(boxes_by_level[level]))))
+    for level, target in zip(BOX_LEVELS, _quota(count, available)):
+        if target > 0:
+            selected.extend(random.sample(boxes_by_level[level], target))
     
     # Shuffle the final selection
     random.shuffle(selected)
@@ -3,7 +3,7 @@ import os
 import uuid
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from fastapi import HTTPException, status, UploadFile
 
 from app.models.media import Media
@@ -80,16 +80,18 @@ async def upload_media(db: AsyncSession, file: UploadFile, user: User) -> Media:
     # For now, we'll just create a placeholder URL
     url = f"/media/{unique_filename}"
     
-    media = Media(
-        url=url,
-        filename=file.filename,
-        mime_type=content_type,
-        uploaded_by_id=user.id
+    result = await db.execute(
+        insert(Media)
+        .values(
+            url=url,
+            filename=file.filename,
+            mime_type=content_type,
+            uploaded_by_id=user.id
+        )
+        .returning(Media)
     )
-    
-    db.add(media)
+    media = result.scalar_one()
     await db.commit()
-    await db.refresh(media)
     
     return media
 
@@ -1,7 +1,8 @@
 """Module service."""
-from typing import List, Optional, Set
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import aliased
 from fastapi import HTTPException, status
 
 from app.models.module import Module
@@ -71,15 +72,17 @@ async def create_module(
                 detail="Prerequisite module must be in the same classroom"
             )
     
-    module = Module(
-        classroom_id=classroom_id,
-        name=name,
-        category=category,
-        prerequisite_module_id=prerequisite_module_id
+    result = await db.execute(
+        insert(Module)
+        .values(
+            classroom_id=classroom_id,
+            name=name,
+            category=category,
+            prerequisite_module_id=prerequisite_module_id
+        )
+        .returning(Module)
     )
-    
-    db.add(module)
-    await db.flush()
+    module = result.scalar_one()
     
     # Check for circular dependency after adding
     if prerequisite_module_id:
@@ -90,7 +93,6 @@ async def create_module(
             )
     
     await db.commit()
-    await db.refresh(module)
     
     return module
 
@@ -133,14 +135,22 @@ async def update_module(
                 detail="Prerequisite module must be in the same classroom"
             )
     
+    values = {}
     if name is not None:
-        module.name = name
+        values["name"] = name
     if category is not None:
-        module.category = category
+        values["category"] = category
     if prerequisite_module_id is not None:
-        module.prerequisite_module_id = prerequisite_module_id
-    
-    await db.flush()
+        values["prerequisite_module_id"] = prerequisite_module_id
+    
+    if values:
+        result = await db.execute(
+            update(Module)
+            .where(Module.id == module_id)
+            .values(**values)
+            .returning(Module)
+        )
+        module = result.scalar_one()
     
     # Check for circular dependency
     if prerequisite_module_id and await has_circular_module_prerequisite(db, module.id):
@@ -150,7 +160,6 @@ async def update_module(
         )
     
     await db.commit()
-    await db.refresh(module)
     
     return module
 
@@ -170,23 +179,27 @@ async def delete_module(db: AsyncSession, module_id: str, user: User):
     await db.commit()
 
 
-async def has_circular_module_prerequisite(db: AsyncSession, module_id: str, visited: Optional[Set[str]] = None, depth: int = 0) -> bool:
+async def has_circular_module_prerequisite(db: AsyncSession, module_id: str) -> bool:
     """Check if a module has a circular prerequisite dependency."""
-    if depth > MAX_PREREQUISITE_DEPTH:
-        return True
-    
-    if visited is None:
-        visited = set()
-    
-    if module_id in visited:
-        return True
-    
-    visited.add(module_id)
-    
-    result = await db.execute(select(Module).where(Module.id == module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not module.prerequisite_module_id:
-        return False
+    # Prerequisites stay within a classroom: fetch its whole graph in one query
+    target = aliased(Module)
+    result = await db.execute(
+        select(Module.id, Module.prerequisite_module_id)
+        .where(
+            Module.classroom_id == select(target.classroom_id).where(target.id == module_id).scalar_subquery()
+        )
+    )
+    prerequisites = dict(result.all())
+    
+    visited = set()
+    current = module_id
+    for _ in range(MAX_PREREQUISITE_DEPTH + 1):
+        if current in visited:
+            return True
+        visited.add(current)
+        
+        current = prerequisites.get(current)
+        if not current:
+            return False
     
-    return await has_circular_module_prerequisite(db, module.prerequisite_module_id, visited, depth + 1)
+    return True
@@ -1,7 +1,7 @@
 """Progress service."""
 from typing import List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, lambda_stmt, bindparam
 from fastapi import HTTPException, status
 
 from app.models.user import User
@@ -12,9 +12,37 @@ from app.models.completion import CompletedQuiz, CompletedModule
 from app.services.classroom_service import is_classroom_member, is_classroom_teacher
 
 
+# Prebuilt statements for the hot quiz-progress path, executed with bound parameters
+_QUIZ_WITH_CLASSROOM_STMT = (
+    select(Quiz, Module.classroom_id)
+    .outerjoin(Module, Module.id == Quiz.module_id)
+    .where(Quiz.id == bindparam("quiz_id"))
+)
+
+_COMPLETED_QUIZ_STMT = select(CompletedQuiz.quiz_id).where(
+    CompletedQuiz.student_id == bindparam("student_id"),
+    CompletedQuiz.quiz_id == bindparam("quiz_id")
+)
+
+
+def _quiz_score_stmt(quiz_id: str, student_id: str):
+    """Cached statement computing best score and attempt count for a quiz."""
+    return lambda_stmt(
+        lambda: select(
+            func.max(QuizSession.total_score * 20.0 / QuizSession.max_score),
+            func.count(QuizSession.id)
+        ).where(
+            QuizSession.quiz_id == quiz_id,
+            QuizSession.student_id == student_id,
+            QuizSession.status == SessionStatus.COMPLETED,
+            QuizSession.max_score > 0
+        )
+    )
+
+
 async def get_module_progress(db: AsyncSession, module_id: str, user: User) -> Dict[str, Any]:
     """Get student progress on a module."""
-    result = await db.execute(select(Module).where(Module.id == module_id))
+    result = await db.execute(lambda_stmt(lambda: select(Module).where(Module.id == module_id)))
     module = result.scalar_one_or_none()
     
     if not module:
@@ -23,17 +51,18 @@ async def get_module_progress(db: AsyncSession, module_id: str, user: User) -> D
     if not await is_classroom_member(db, module.classroom_id, user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
-    # Check if module is locked
-    is_locked = False
-    if module.prerequisite_module_id:
-        result = await db.execute(
-            select(CompletedModule)
-            .where(
-                CompletedModule.student_id == user.id,
-                CompletedModule.module_id == module.prerequisite_module_id
-            )
+    # Fetch completion of the module and of its prerequisite in one query
+    result = await db.execute(
+        select(CompletedModule.module_id)
+        .where(
+            CompletedModule.student_id == user.id,
+            CompletedModule.module_id.in_([module_id, module.prerequisite_module_id])
         )
-        is_locked = result.scalar_one_or_none() is None
+    )
+    completed_module_ids = set(result.scalars().all())
+    
+    # Check if module is locked
+    is_locked = bool(module.prerequisite_module_id) and module.prerequisite_module_id not in completed_module_ids
     
     # Get all quizzes in module
     result = await db.execute(
@@ -41,34 +70,28 @@ async def get_module_progress(db: AsyncSession, module_id: str, user: User) -> D
     )
     quizzes = list(result.scalars().all())
     
+    # Fetch completed quizzes of the module in one query
+    quiz_ids = [quiz.id for quiz in quizzes]
+    completed_ids = set()
+    if quiz_ids:
+        result = await db.execute(
+            select(CompletedQuiz.quiz_id)
+            .where(CompletedQuiz.student_id == user.id, CompletedQuiz.quiz_id.in_(quiz_ids))
+        )
+        completed_ids = set(result.scalars().all())
+    
     # Get progress for each quiz
     quiz_progress = []
     completed_count = 0
     
     for quiz in quizzes:
-        # Check if completed
-        result = await db.execute(
-            select(CompletedQuiz)
-            .where(CompletedQuiz.student_id == user.id, CompletedQuiz.quiz_id == quiz.id)
-        )
-        is_completed = result.scalar_one_or_none() is not None
+        is_completed = quiz.id in completed_ids
         
         if is_completed:
             completed_count += 1
         
         # Get best score and attempts
-        result = await db.execute(
-            select(
-                func.max(QuizSession.total_score * 20.0 / QuizSession.max_score),
-                func.count(QuizSession.id)
-            )
-            .where(
-                QuizSession.quiz_id == quiz.id,
-                QuizSession.student_id == user.id,
-                QuizSession.status == SessionStatus.COMPLETED,
-                QuizSession.max_score > 0
-            )
-        )
+        result = await db.execute(_quiz_score_stmt(quiz.id, user.id))
         best_score, attempts = result.one()
         
         quiz_progress.append({
@@ -80,11 +103,7 @@ async def get_module_progress(db: AsyncSession, module_id: str, user: User) -> D
         })
     
     # Check if module is completed
-    result = await db.execute(
-        select(CompletedModule)
-        .where(CompletedModule.student_id == user.id, CompletedModule.module_id == module_id)
-    )
-    is_module_completed = result.scalar_one_or_none() is not None
+    is_module_completed = module_id in completed_module_ids
     
     # Calculate completion rate
     completion_rate = round(completed_count / len(quizzes), 2) if len(quizzes) > 0 else 0.0
@@ -104,50 +123,32 @@ async def get_module_progress(db: AsyncSession, module_id: str, user: User) -> D
 
 async def get_quiz_progress(db: AsyncSession, quiz_id: str, user: User) -> Dict[str, Any]:
     """Get student progress on a quiz."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    result = await db.execute(_QUIZ_WITH_CLASSROOM_STMT, {"quiz_id": quiz_id})
+    row = result.first()
     
-    if not quiz:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
+    quiz, classroom_id = row
     
-    if not module or not await is_classroom_member(db, module.classroom_id, user.id):
+    if not classroom_id or not await is_classroom_member(db, classroom_id, user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
     # Check if quiz is locked
     is_locked = False
     if quiz.prerequisite_quiz_id:
         result = await db.execute(
-            select(CompletedQuiz)
-            .where(
-                CompletedQuiz.student_id == user.id,
-                CompletedQuiz.quiz_id == quiz.prerequisite_quiz_id
-            )
+            _COMPLETED_QUIZ_STMT,
+            {"student_id": user.id, "quiz_id": quiz.prerequisite_quiz_id}
         )
         is_locked = result.scalar_one_or_none() is None
     
     # Check if completed
-    result = await db.execute(
-        select(CompletedQuiz)
-        .where(CompletedQuiz.student_id == user.id, CompletedQuiz.quiz_id == quiz_id)
-    )
+    result = await db.execute(_COMPLETED_QUIZ_STMT, {"student_id": user.id, "quiz_id": quiz_id})
     is_completed = result.scalar_one_or_none() is not None
     
     # Get best score and attempts
-    result = await db.execute(
-        select(
-            func.max(QuizSession.total_score * 20.0 / QuizSession.max_score),
-            func.count(QuizSession.id)
-        )
-        .where(
-            QuizSession.quiz_id == quiz_id,
-            QuizSession.student_id == user.id,
-            QuizSession.status == SessionStatus.COMPLETED,
-            QuizSession.max_score > 0
-        )
-    )
+    result = await db.execute(_quiz_score_stmt(quiz_id, user.id))
     best_score, attempts = result.one()
     
     return {
@@ -1,70 +1,190 @@
-"""Question service."""
+"""Question service.
+
+Use selectinload for collections, joinedload only for one-to-one like Question.text_config.
+"""
 from typing import List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, delete, exists, literal, Row
+from sqlalchemy.orm import selectinload, joinedload, raiseload
 from fastapi import HTTPException, status
 
 from app.models.question import (
     Question, QuestionType, QuestionOption, MatchingPair, ImageZone, TextConfig
 )
-from app.models.quiz import Quiz
-from app.models.module import Module
+from app.models.media import Media
 from app.models.user import User
-from app.services.classroom_service import is_classroom_teacher
+from app.services.quiz_service import authorize_quiz_teacher, get_quiz_for_teacher
+
+
+# Built once at import time; loader options are immutable and safe to share
+_QUESTION_EAGER = (
+    # Sibling collections stay on selectinload: joining them would multiply rows
+    selectinload(Question.options),
+    selectinload(Question.matching_pairs),
+    selectinload(Question.image_zones),
+    joinedload(Question.text_config),
+    # Any other relationship must be loaded explicitly instead of lazily
+    raiseload("*"),
+)
 
 
-def _question_eager_options():
-    """Return selectinload options for Question relationships."""
+def _option_rows(question_id: str, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build QuestionOption rows for a bulk insert."""
     return [
-        selectinload(Question.options),
-        selectinload(Question.matching_pairs),
-        selectinload(Question.image_zones),
-        selectinload(Question.text_config),
+        {
+            "question_id": question_id,
+            "text_choice": option["text_choice"],
+            "is_correct": option["is_correct"],
+            "display_order": i
+        }
+        for i, option in enumerate(options)
     ]
 
 
+def _matching_pair_rows(question_id: str, pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build MatchingPair rows for a bulk insert."""
+    return [
+        {"question_id": question_id, "item_left": pair["item_left"], "item_right": pair["item_right"]}
+        for pair in pairs
+    ]
+
+
+def _image_zone_rows(question_id: str, zones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build ImageZone rows for a bulk insert."""
+    return [
+        {
+            "question_id": question_id,
+            "label_name": zone["label_name"],
+            "x": zone["x"],
+            "y": zone["y"],
+            "radius": zone["radius"]
+        }
+        for zone in zones
+    ]
+
+
+def _child_rows(question_id: str, question_data: Dict[str, Any]) -> Dict[Any, List[Dict[str, Any]]]:
+    """Build the type-specific child rows of a new question, keyed by model."""
+    qtype = question_data["type"]
+    
+    if qtype in [QuestionType.QCM, QuestionType.VRAI_FAUX]:
+        return {QuestionOption: _option_rows(question_id, question_data.get("options") or [])}
+    
+    if qtype == QuestionType.MATCHING:
+        return {MatchingPair: _matching_pair_rows(question_id, question_data.get("matching_pairs") or [])}
+    
+    if qtype == QuestionType.IMAGE:
+        return {ImageZone: _image_zone_rows(question_id, question_data.get("image_zones") or [])}
+    
+    if qtype == QuestionType.TEXT:
+        text_config = question_data["text_config"]
+        return {TextConfig: [{
+            "question_id": question_id,
+            "accepted_answer": text_config["accepted_answer"],
+            "is_case_sensitive": text_config.get("is_case_sensitive", False),
+            "ignore_spelling_errors": text_config.get("ignore_spelling_errors", True)
+        }]}
+    
+    return {}
+
+
+async def _bulk_insert(db: AsyncSession, model, rows: List[Dict[str, Any]]):
+    """Insert child rows in a single executemany statement."""
+    if rows:
+        await db.execute(insert(model), rows)
+
+
+async def _sync_options(db: AsyncSession, question: Question, options: List[Dict[str, Any]]):
+    """Apply the minimal UPDATE/INSERT/DELETE to match options, keyed by display order."""
+    existing = {option.display_order: option for option in question.options}
+    to_update, to_insert = [], []
+    
+    for row in _option_rows(question.id, options):
+        current = existing.pop(row["display_order"], None)
+        if current is None:
+            to_insert.append(row)
+        elif (current.text_choice, current.is_correct) != (row["text_choice"], row["is_correct"]):
+            to_update.append({"id": current.id, "text_choice": row["text_choice"], "is_correct": row["is_correct"]})
+    
+    if to_update:
+        await db.execute(update(QuestionOption), to_update)
+    if existing:
+        await db.execute(
+            delete(QuestionOption)
+            .where(QuestionOption.id.in_([option.id for option in existing.values()]))
+            .execution_options(synchronize_session=False)
+        )
+    await _bulk_insert(db, QuestionOption, to_insert)
+
+
+async def _sync_children(db: AsyncSession, model, existing: list, rows: List[Dict[str, Any]], fields: tuple):
+    """Keep children whose fields are unchanged, delete the others and insert the new ones."""
+    remaining = list(existing)
+    to_insert = []
+    
+    for row in rows:
+        key = tuple(row[field] for field in fields)
+        match = next((child for child in remaining if tuple(getattr(child, f) for f in fields) == key), None)
+        if match is None:
+            to_insert.append(row)
+        else:
+            remaining.remove(match)
+    
+    if remaining:
+        await db.execute(
+            delete(model)
+            .where(model.id.in_([child.id for child in remaining]))
+            .execution_options(synchronize_session=False)
+        )
+    await _bulk_insert(db, model, to_insert)
+
+
 async def _reload_question(db: AsyncSession, question_id: str) -> Question:
     """Reload a question with all relationships eagerly loaded."""
     result = await db.execute(
         select(Question)
         .where(Question.id == question_id)
-        .options(*_question_eager_options())
+        .options(*_QUESTION_EAGER)
+        .execution_options(populate_existing=True)
     )
     return result.scalar_one()
 
 
 async def get_questions_by_quiz(db: AsyncSession, quiz_id: str, user: User) -> List[Question]:
     """Get all questions for a quiz (teacher only - includes answers)."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    if not quiz:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    await get_quiz_for_teacher(db, quiz_id, user.id)
     
     result = await db.execute(
         select(Question)
         .where(Question.quiz_id == quiz_id)
-        .options(*_question_eager_options())
+        .options(*_QUESTION_EAGER)
         .order_by(Question.created_at)
     )
     return list(result.scalars().all())
 
 
-async def get_question_by_id(db: AsyncSession, question_id: str, user: User) -> Question:
-    """Get a question by ID."""
+async def get_questions_by_quiz_lite(db: AsyncSession, quiz_id: str, user: User) -> List[Row]:
+    """Get the questions of a quiz as plain column rows, without answers or children."""
+    await get_quiz_for_teacher(db, quiz_id, user.id)
+    
     result = await db.execute(
-        select(Question)
-        .where(Question.id == question_id)
-        .options(*_question_eager_options())
+        select(
+            Question.id,
+            Question.type,
+            Question.content_text,
+            Question.explanation,
+            Question.media_id,
+            Question.created_at
+        )
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.created_at)
     )
-    question = result.scalar_one_or_none()
+    return list(result.all())
+
+
+async def get_question_by_id(db: AsyncSession, question_id: str, user: User) -> Question:
+    """Get a question by ID."""
+    question = await db.get(Question, question_id, options=_QUESTION_EAGER)
     
     if not question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
@@ -79,111 +199,90 @@ async def create_question(
     user: User
 ) -> Question:
     """Create a new question (teacher of course)."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    if not quiz:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
-    
-    # Validate type-specific data
-    qtype = question_data["type"]
+    # Check media existence in the same statement as the permission check
+    media_id = question_data.get("media_id")
+    _, media_exists = await authorize_quiz_teacher(
+        db, quiz_id, user.id,
+        exists().where(Media.id == media_id) if media_id else literal(False)
+    )
     
-    if qtype in ["QCM", QuestionType.QCM]:
-        options = question_data.get("options") or []
-        if not options:
-            raise HTTPException(status_code=400, detail="QCM questions require options")
-        if not any(o.get("is_correct") for o in options):
-            raise HTTPException(status_code=400, detail="QCM questions require at least one correct option")
-    
-    elif qtype in ["VRAI_FAUX", QuestionType.VRAI_FAUX]:
-        options = question_data.get("options") or []
-        if len(options) != 2:
-            raise HTTPException(status_code=400, detail="VRAI_FAUX questions require exactly 2 options")
-    
-    elif qtype in ["MATCHING", QuestionType.MATCHING]:
-        pairs = question_data.get("matching_pairs") or []
-        if len(pairs) < 2:
-            raise HTTPException(status_code=400, detail="MATCHING questions require at least 2 pairs")
-    
-    elif qtype in ["TEXT", QuestionType.TEXT]:
-        tc = question_data.get("text_config")
-        if not tc or not tc.get("accepted_answer"):
-            raise HTTPException(status_code=400, detail="TEXT questions require textConfig with acceptedAnswer")
-    
-    elif qtype in ["IMAGE", QuestionType.IMAGE]:
-        if not question_data.get("media_id"):
-            raise HTTPException(status_code=400, detail="IMAGE questions require a mediaId")
-        zones = question_data.get("image_zones") or []
-        if not zones:
-            raise HTTPException(status_code=400, detail="IMAGE questions require imageZones")
-        # Validate media exists
-        from app.models.media import Media
-        media_result = await db.execute(select(Media).where(Media.id == question_data["media_id"]))
-        if not media_result.scalar_one_or_none():
-            raise HTTPException(status_code=404, detail="Media not found")
+    # Payload shape is validated by the QuestionCreateDto union; only media needs the database
+    if media_id and not media_exists:
+        raise HTTPException(status_code=404, detail="Media not found")
     
     question = Question(
         quiz_id=quiz_id,
         type=question_data["type"],
         content_text=question_data["content_text"],
         explanation=question_data.get("explanation"),
-        media_id=question_data.get("media_id")
+        media_id=media_id
     )
     
     db.add(question)
     await db.flush()
     
     # Create type-specific data
-    if question_data["type"] in [QuestionType.QCM, QuestionType.VRAI_FAUX]:
-        for i, option in enumerate(question_data.get("options", [])):
-            question_option = QuestionOption(
-                question_id=question.id,
-                text_choice=option["text_choice"],
-                is_correct=option["is_correct"],
-                display_order=i
-            )
-            db.add(question_option)
-    
-    elif question_data["type"] == QuestionType.MATCHING:
-        for pair in question_data.get("matching_pairs", []):
-            matching_pair = MatchingPair(
-                question_id=question.id,
-                item_left=pair["item_left"],
-                item_right=pair["item_right"]
-            )
-            db.add(matching_pair)
-    
-    elif question_data["type"] == QuestionType.IMAGE:
-        for zone in question_data.get("image_zones", []):
-            image_zone = ImageZone(
-                question_id=question.id,
-                label_name=zone["label_name"],
-                x=zone["x"],
-                y=zone["y"],
-                radius=zone["radius"]
-            )
-            db.add(image_zone)
-    
-    elif question_data["type"] == QuestionType.TEXT:
-        text_config = TextConfig(
-            question_id=question.id,
-            accepted_answer=question_data["text_config"]["accepted_answer"],
-            is_case_sensitive=question_data["text_config"].get("is_case_sensitive", False),
-            ignore_spelling_errors=question_data["text_config"].get("ignore_spelling_errors", True)
-        )
-        db.add(text_config)
+    for model, rows in _child_rows(question.id, question_data).items():
+        await _bulk_insert(db, model, rows)
     
     await db.commit()
     
     return await _reload_question(db, question.id)
 
 
+async def create_questions_bulk(
+    db: AsyncSession,
+    quiz_id: str,
+    items: List[Dict[str, Any]],
+    user: User
+) -> List[Question]:
+    """Create several questions at once with one INSERT per table (teacher of course)."""
+    await get_quiz_for_teacher(db, quiz_id, user.id)
+    
+    if not items:
+        return []
+    
+    media_ids = {item["media_id"] for item in items if item.get("media_id")}
+    if media_ids:
+        result = await db.execute(select(Media.id).where(Media.id.in_(media_ids)))
+        if media_ids - set(result.scalars().all()):
+            raise HTTPException(status_code=404, detail="Media not found")
+    
+    # Parent rows in one INSERT ... RETURNING, ids come back in payload order
+    result = await db.execute(
+        insert(Question).returning(Question.id, sort_by_parameter_order=True),
+        [
+            {
+                "quiz_id": quiz_id,
+                "type": item["type"],
+                "content_text": item["content_text"],
+                "explanation": item.get("explanation"),
+                "media_id": item.get("media_id")
+            }
+            for item in items
+        ]
+    )
+    question_ids = list(result.scalars().all())
+    
+    # Children of every question, one INSERT per child table
+    children: Dict[Any, List[Dict[str, Any]]] = {}
+    for question_id, item in zip(question_ids, items):
+        for model, rows in _child_rows(question_id, item).items():
+            children.setdefault(model, []).extend(rows)
+    for model, rows in children.items():
+        await _bulk_insert(db, model, rows)
+    
+    await db.commit()
+    
+    result = await db.execute(
+        select(Question)
+        .where(Question.id.in_(question_ids))
+        .options(*_QUESTION_EAGER)
+    )
+    questions = {question.id: question for question in result.scalars().all()}
+    return [questions[question_id] for question_id in question_ids]
+
+
 async def update_question(
     db: AsyncSession,
     question_id: str,
@@ -191,20 +290,20 @@ async def update_question(
     user: User
 ) -> Question:
     """Update a question (teacher of course)."""
-    result = await db.execute(select(Question).where(Question.id == question_id))
-    question = result.scalar_one_or_none()
+    question = await db.get(Question, question_id, options=_QUESTION_EAGER)
     
     if not question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     
-    result = await db.execute(select(Quiz).where(Quiz.id == question.quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
+    # A new media id is checked in the same statement as the permission check
+    media_id = question_data.get("media_id")
+    _, media_exists = await authorize_quiz_teacher(
+        db, question.quiz_id, user.id,
+        exists().where(Media.id == media_id) if media_id else literal(True)
+    )
     
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    if not media_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
     
     # Update base question
     if "content_text" in question_data:
@@ -214,49 +313,33 @@ async def update_question(
     if "media_id" in question_data:
         question.media_id = question_data["media_id"]
     
-    # Delete old type-specific data and recreate
+    # Diff type-specific data against the stored rows and only write what changed
     if "options" in question_data:
-        await db.execute(QuestionOption.__table__.delete().where(QuestionOption.question_id == question_id))
-        for i, option in enumerate(question_data["options"]):
-            question_option = QuestionOption(
-                question_id=question.id,
-                text_choice=option["text_choice"],
-                is_correct=option["is_correct"],
-                display_order=i
-            )
-            db.add(question_option)
+        await _sync_options(db, question, question_data["options"])
     
     if "matching_pairs" in question_data:
-        await db.execute(MatchingPair.__table__.delete().where(MatchingPair.question_id == question_id))
-        for pair in question_data["matching_pairs"]:
-            matching_pair = MatchingPair(
-                question_id=question.id,
-                item_left=pair["item_left"],
-                item_right=pair["item_right"]
-            )
-            db.add(matching_pair)
+        await _sync_children(
+            db, MatchingPair, question.matching_pairs,
+            _matching_pair_rows(question.id, question_data["matching_pairs"]),
+            ("item_left", "item_right")
+        )
     
     if "image_zones" in question_data:
-        await db.execute(ImageZone.__table__.delete().where(ImageZone.question_id == question_id))
-        for zone in question_data["image_zones"]:
-            image_zone = ImageZone(
-                question_id=question.id,
-                label_name=zone["label_name"],
-                x=zone["x"],
-                y=zone["y"],
-                radius=zone["radius"]
-            )
-            db.add(image_zone)
+        await _sync_children(
+            db, ImageZone, question.image_zones,
+            _image_zone_rows(question.id, question_data["image_zones"]),
+            ("label_name", "x", "y", "radius")
+        )
     
     if "text_config" in question_data:
-        await db.execute(TextConfig.__table__.delete().where(TextConfig.question_id == question_id))
-        text_config = TextConfig(
-            question_id=question.id,
-            accepted_answer=question_data["text_config"]["accepted_answer"],
-            is_case_sensitive=question_data["text_config"].get("is_case_sensitive", False),
-            ignore_spelling_errors=question_data["text_config"].get("ignore_spelling_errors", True)
-        )
-        db.add(text_config)
+        config = question_data["text_config"]
+        text_config = question.text_config
+        if text_config is None:
+            text_config = TextConfig(question_id=question.id)
+            db.add(text_config)
+        text_config.accepted_answer = config["accepted_answer"]
+        text_config.is_case_sensitive = config.get("is_case_sensitive", False)
+        text_config.ignore_spelling_errors = config.get("ignore_spelling_errors", True)
     
     await db.commit()
     
@@ -265,31 +348,13 @@ async def update_question(
 
 async def delete_question(db: AsyncSession, question_id: str, user: User):
     """Delete a question (teacher of course)."""
-    from app.models.leitner import LeitnerBox, LeitnerSessionAnswer
-    from app.models.session import SessionAnswer
-    result = await db.execute(
-        select(Question)
-        .where(Question.id == question_id)
-        .options(
-            *_question_eager_options(),
-            selectinload(Question.leitner_boxes),
-            selectinload(Question.leitner_session_answers),
-            selectinload(Question.session_answers),
-        )
-    )
-    question = result.scalar_one_or_none()
+    quiz_id = await db.scalar(select(Question.quiz_id).where(Question.id == question_id))
     
-    if not question:
+    if not quiz_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     
-    result = await db.execute(select(Quiz).where(Quiz.id == question.quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    await get_quiz_for_teacher(db, quiz_id, user.id)
     
-    await db.delete(question)
+    # Children, Leitner boxes and answers go with ON DELETE CASCADE
+    await db.execute(delete(Question).where(Question.id == question_id))
     await db.commit()
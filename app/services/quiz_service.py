@@ -1,18 +1,46 @@
 """Quiz service."""
-from typing import List, Optional, Set
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, case, and_, literal, exists
+from sqlalchemy.orm import joinedload
 from fastapi import HTTPException, status
 
+from app.models.classroom import Classroom
 from app.models.quiz import Quiz
 from app.models.module import Module
 from app.models.user import User
-from app.services.classroom_service import is_classroom_teacher
+from app.services.classroom_service import is_classroom_teacher_loaded, classroom_teacher_condition
 
 
 MAX_PREREQUISITE_DEPTH = 50
 
 
+async def authorize_quiz_teacher(db: AsyncSession, quiz_id: str, user_id: str, *columns) -> tuple:
+    """Check the user teaches the quiz's classroom and fetch extra columns in the same query."""
+    result = await db.execute(
+        select(Quiz, Module.id, classroom_teacher_condition(Module.classroom_id, user_id), *columns)
+        .outerjoin(Module, Module.id == Quiz.module_id)
+        .where(Quiz.id == quiz_id)
+    )
+    row = result.first()
+    
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+    
+    quiz, module_id, is_teacher, *extra = row
+    
+    if not module_id or not is_teacher:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    
+    return (quiz, *extra)
+
+
+async def get_quiz_for_teacher(db: AsyncSession, quiz_id: str, user_id: str) -> Quiz:
+    """Get a quiz after checking the user teaches its classroom, in a single query."""
+    quiz, = await authorize_quiz_teacher(db, quiz_id, user_id)
+    return quiz
+
+
 async def get_quizzes_by_module(db: AsyncSession, module_id: str) -> List[Quiz]:
     """Get all quizzes for a module."""
     result = await db.execute(
@@ -25,8 +53,7 @@ async def get_quizzes_by_module(db: AsyncSession, module_id: str) -> List[Quiz]:
 
 async def get_quiz_by_id(db: AsyncSession, quiz_id: str) -> Quiz:
     """Get a quiz by ID."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    quiz = await db.get(Quiz, quiz_id)
     
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
@@ -44,13 +71,17 @@ async def create_quiz(
     user: User
 ) -> Quiz:
     """Create a new quiz (teacher of course)."""
-    result = await db.execute(select(Module).where(Module.id == module_id))
-    module = result.scalar_one_or_none()
+    # Many-to-one classroom is joined; its teachers collection is selectin-loaded
+    module = await db.get(
+        Module,
+        module_id,
+        options=[joinedload(Module.classroom).selectinload(Classroom.teachers)]
+    )
     
     if not module:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Module not found")
     
-    if not await is_classroom_teacher(db, module.classroom_id, user.id):
+    if not is_classroom_teacher_loaded(module.classroom, user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
     # Validate min_score_to_unlock_next
@@ -62,10 +93,7 @@ async def create_quiz(
     
     # Validate prerequisite
     if prerequisite_quiz_id:
-        result = await db.execute(select(Quiz).where(Quiz.id == prerequisite_quiz_id))
-        prereq = result.scalar_one_or_none()
-        
-        if not prereq:
+        if not await db.scalar(select(exists().where(Quiz.id == prerequisite_quiz_id))):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prerequisite quiz not found")
     
     quiz = Quiz(
@@ -88,7 +116,6 @@ async def create_quiz(
         )
     
     await db.commit()
-    await db.refresh(quiz)
     
     return quiz
 
@@ -103,17 +130,7 @@ async def update_quiz(
     user: User
 ) -> Quiz:
     """Update a quiz (teacher of course)."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    if not quiz:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    quiz = await get_quiz_for_teacher(db, quiz_id, user.id)
     
     # Validate prerequisite
     if prerequisite_quiz_id is not None:
@@ -124,10 +141,7 @@ async def update_quiz(
             )
         
         if prerequisite_quiz_id:
-            result = await db.execute(select(Quiz).where(Quiz.id == prerequisite_quiz_id))
-            prereq = result.scalar_one_or_none()
-            
-            if not prereq:
+            if not await db.scalar(select(exists().where(Quiz.id == prerequisite_quiz_id))):
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prerequisite quiz not found")
     
     if title is not None:
@@ -149,46 +163,38 @@ async def update_quiz(
         )
     
     await db.commit()
-    await db.refresh(quiz)
     
     return quiz
 
 
 async def delete_quiz(db: AsyncSession, quiz_id: str, user: User):
     """Delete a quiz (teacher of course)."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    if not quiz:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module or not await is_classroom_teacher(db, module.classroom_id, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+    quiz = await get_quiz_for_teacher(db, quiz_id, user.id)
     
     await db.delete(quiz)
     await db.commit()
 
 
-async def has_circular_quiz_prerequisite(db: AsyncSession, quiz_id: str, visited: Optional[Set[str]] = None, depth: int = 0) -> bool:
+async def has_circular_quiz_prerequisite(db: AsyncSession, quiz_id: str) -> bool:
     """Check if a quiz has a circular prerequisite dependency."""
-    if depth > MAX_PREREQUISITE_DEPTH:
-        return True
-    
-    if visited is None:
-        visited = set()
-    
-    if quiz_id in visited:
-        return True
-    
-    visited.add(quiz_id)
-    
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    # Walk the prerequisite chain server-side with a recursive CTE (one round-trip)
+    chain = (
+        select(Quiz.id, Quiz.prerequisite_quiz_id.label("prerequisite_id"), literal(0).label("depth"))
+        .where(Quiz.id == quiz_id)
+        .cte("prerequisite_chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(Quiz.id, Quiz.prerequisite_quiz_id, chain.c.depth + 1)
+        .join(chain, Quiz.id == chain.c.prerequisite_id)
+        .where(chain.c.depth <= MAX_PREREQUISITE_DEPTH)
+    )
     
-    if not quiz or not quiz.prerequisite_quiz_id:
-        return False
+    result = await db.execute(
+        select(
+            func.max(case((and_(chain.c.depth > 0, chain.c.id == quiz_id), 1), else_=0)),
+            func.max(chain.c.depth)
+        )
+    )
+    loops_back, depth = result.one()
     
-    return await has_circular_quiz_prerequisite(db, quiz.prerequisite_quiz_id, visited, depth + 1)
+    return bool(loops_back) or (depth or 0) > MAX_PREREQUISITE_DEPTH
@@ -1,9 +1,11 @@
 """Quiz session service."""
-import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func, exists, bindparam, Float
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi import HTTPException, status
 
 from app.models.session import QuizSession, SessionAnswer, SessionStatus
@@ -13,73 +15,101 @@ from app.models.module import Module
 from app.models.completion import CompletedQuiz, CompletedModule
 from app.models.leitner import LeitnerBox
 from app.models.user import User
-from app.services.classroom_service import is_classroom_member
+from app.services.classroom_service import classroom_member_condition
+
+
+SESSION_TIMEOUT = timedelta(hours=2)
+
+
+# Prebuilt statements for answer evaluation, executed with bound parameters on every submit
+_CORRECT_OPTION_IDS_STMT = select(QuestionOption.id).where(
+    QuestionOption.question_id == bindparam("question_id"),
+    QuestionOption.is_correct == True
+)
+
+_MATCHING_PAIRS_STMT = select(MatchingPair.item_left, MatchingPair.item_right).where(
+    MatchingPair.question_id == bindparam("question_id")
+)
+
+_IMAGE_ZONE_IDS_STMT = select(ImageZone.id).where(ImageZone.question_id == bindparam("question_id"))
+
+# Squared distances are compared in SQL; only a boolean comes back
+_dx = ImageZone.x - bindparam("x", type_=Float)
+_dy = ImageZone.y - bindparam("y", type_=Float)
+_CLICK_IN_ZONE_STMT = select(exists().where(
+    ImageZone.question_id == bindparam("question_id"),
+    _dx * _dx + _dy * _dy <= ImageZone.radius * ImageZone.radius
+))
+
+_TEXT_CONFIG_STMT = select(TextConfig.accepted_answer, TextConfig.is_case_sensitive).where(
+    TextConfig.question_id == bindparam("question_id")
+)
 
 
 async def start_session(db: AsyncSession, quiz_id: str, user: User) -> QuizSession:
     """Start a new quiz session (student only)."""
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    # Quiz, module, membership, both prerequisites and the question count in one round trip
+    result = await db.execute(
+        select(
+            Quiz,
+            Module.id,
+            Module.classroom_id,
+            Module.prerequisite_module_id,
+            classroom_member_condition(Module.classroom_id, user.id),
+            exists().where(
+                CompletedQuiz.student_id == user.id,
+                CompletedQuiz.quiz_id == Quiz.prerequisite_quiz_id
+            ),
+            exists().where(
+                CompletedModule.student_id == user.id,
+                CompletedModule.module_id == Module.prerequisite_module_id
+            ),
+            select(func.count(Question.id)).where(Question.quiz_id == Quiz.id).scalar_subquery()
+        )
+        .outerjoin(Module, Module.id == Quiz.module_id)
+        .where(Quiz.id == quiz_id)
+    )
+    row = result.first()
     
-    if not quiz:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     
+    (
+        quiz, module_id, classroom_id, prerequisite_module_id,
+        is_member, prerequisite_quiz_done, prerequisite_module_done, question_count
+    ) = row
+    
     # Check if quiz is active
     if not quiz.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="QUIZ_INACTIVE")
     
-    result = await db.execute(select(Module).where(Module.id == quiz.module_id))
-    module = result.scalar_one_or_none()
-    
-    if not module:
+    if not module_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Module not found")
     
     # Check if user is member of classroom
-    if not await is_classroom_member(db, module.classroom_id, user.id):
+    if not is_member:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
     # Check if quiz is locked by prerequisite
-    if quiz.prerequisite_quiz_id:
-        result = await db.execute(
-            select(CompletedQuiz)
-            .where(
-                CompletedQuiz.student_id == user.id,
-                CompletedQuiz.quiz_id == quiz.prerequisite_quiz_id
-            )
+    if quiz.prerequisite_quiz_id and not prerequisite_quiz_done:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="QUIZ_LOCKED"
         )
-        if not result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="QUIZ_LOCKED"
-            )
     
     # Check if module is locked by prerequisite
-    if module.prerequisite_module_id:
-        result = await db.execute(
-            select(CompletedModule)
-            .where(
-                CompletedModule.student_id == user.id,
-                CompletedModule.module_id == module.prerequisite_module_id
-            )
+    if prerequisite_module_id and not prerequisite_module_done:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="MODULE_LOCKED"
         )
-        if not result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="MODULE_LOCKED"
-            )
-    
-    # Get question count for max_score
-    result = await db.execute(
-        select(func.count(Question.id)).where(Question.quiz_id == quiz_id)
-    )
-    question_count = result.scalar() or 0
     
     session = QuizSession(
         quiz_id=quiz_id,
         student_id=user.id,
-        classroom_id=module.classroom_id,
+        classroom_id=classroom_id,
         status=SessionStatus.IN_PROGRESS,
-        max_score=question_count
+        max_score=question_count or 0
     )
     
     db.add(session)
@@ -97,12 +127,18 @@ async def submit_answer(
     user: User
 ) -> bool:
     """Submit an answer to a question in a session."""
-    result = await db.execute(select(QuizSession).where(QuizSession.id == session_id))
-    session = result.scalar_one_or_none()
+    # The timeout is evaluated by the database alongside the session lookup
+    result = await db.execute(
+        select(QuizSession, QuizSession.started_at < datetime.utcnow() - SESSION_TIMEOUT)
+        .where(QuizSession.id == session_id)
+    )
+    row = result.first()
     
-    if not session:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SESSION_NOT_FOUND")
     
+    session, is_expired = row
+    
     if session.student_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
@@ -112,9 +148,14 @@ async def submit_answer(
             detail="SESSION_ALREADY_FINISHED"
         )
     
-    # Check for session timeout (2 hours)
-    if datetime.utcnow() - session.started_at > timedelta(hours=2):
-        session.status = SessionStatus.ABANDONED
+    # Check for session timeout
+    if is_expired:
+        await db.execute(
+            update(QuizSession)
+            .where(QuizSession.id == session_id)
+            .values(status=SessionStatus.ABANDONED)
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -131,11 +172,10 @@ async def submit_answer(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="QUESTION_NOT_IN_SESSION")
     
     # Check if already answered
-    result = await db.execute(
-        select(SessionAnswer)
-        .where(SessionAnswer.session_id == session_id, SessionAnswer.question_id == question_id)
+    already_answered = await db.scalar(
+        select(exists().where(SessionAnswer.session_id == session_id, SessionAnswer.question_id == question_id))
     )
-    if result.scalar_one_or_none():
+    if already_answered:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Question already answered")
     
     # Evaluate answer
@@ -145,7 +185,7 @@ async def submit_answer(
         session_id=session_id,
         question_id=question_id,
         is_correct=is_correct,
-        answer_data=json.dumps(answer_data)
+        answer_data=answer_data
     )
     
     db.add(answer)
@@ -156,52 +196,71 @@ async def submit_answer(
 
 async def finish_session(db: AsyncSession, session_id: str, user: User) -> QuizSession:
     """Finish a quiz session and calculate score."""
-    result = await db.execute(select(QuizSession).where(QuizSession.id == session_id))
+    correct_count = (
+        select(func.count(SessionAnswer.id))
+        .where(SessionAnswer.session_id == session_id, SessionAnswer.is_correct == True)
+        .scalar_subquery()
+    )
+    min_score = (
+        select(Quiz.min_score_to_unlock_next)
+        .where(Quiz.id == QuizSession.quiz_id)
+        .scalar_subquery()
+    )
+    
+    # Score, status and pass flag are computed and written by the database in one statement
+    result = await db.execute(
+        update(QuizSession)
+        .where(
+            QuizSession.id == session_id,
+            QuizSession.student_id == user.id,
+            QuizSession.status == SessionStatus.IN_PROGRESS
+        )
+        .values(
+            total_score=correct_count,
+            status=SessionStatus.COMPLETED,
+            completed_at=datetime.utcnow(),
+            passed=func.coalesce(correct_count >= min_score, False)
+        )
+        .returning(QuizSession)
+        .execution_options(populate_existing=True)
+    )
     session = result.scalar_one_or_none()
     
     if not session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SESSION_NOT_FOUND")
-    
-    if session.student_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
-    
-    if session.status != SessionStatus.IN_PROGRESS:
+        # Nothing was updated: find out why
+        result = await db.execute(
+            select(QuizSession.student_id).where(QuizSession.id == session_id)
+        )
+        student_id = result.scalar_one_or_none()
+        
+        if not student_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SESSION_NOT_FOUND")
+        
+        if student_id != user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
+        
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="SESSION_ALREADY_FINISHED"
         )
     
-    # Calculate score
-    result = await db.execute(
-        select(func.count(SessionAnswer.id))
-        .where(SessionAnswer.session_id == session_id, SessionAnswer.is_correct == True)
-    )
-    correct_count = result.scalar() or 0
-    
-    session.total_score = correct_count
-    session.status = SessionStatus.COMPLETED
-    session.completed_at = datetime.utcnow()
-    
-    # Get quiz
-    result = await db.execute(select(Quiz).where(Quiz.id == session.quiz_id))
-    quiz = result.scalar_one_or_none()
-    
-    # Check if passed
-    session.passed = session.total_score >= quiz.min_score_to_unlock_next
-    
     await db.commit()
     
     # If passed, auto-create CompletedQuiz and add questions to Leitner
     if session.passed:
         await _complete_quiz(db, session.quiz_id, user.id, session.classroom_id)
     
-    await db.refresh(session)
     return session
 
 
 async def get_session_review(db: AsyncSession, session_id: str, user: User) -> QuizSession:
     """Get session review with corrections (after finish only)."""
-    result = await db.execute(select(QuizSession).where(QuizSession.id == session_id))
+    # Answers are the only relationship the review renders; load them with the session
+    result = await db.execute(
+        select(QuizSession)
+        .where(QuizSession.id == session_id)
+        .options(selectinload(QuizSession.answers))
+    )
     session = result.scalar_one_or_none()
     
     if not session:
@@ -221,71 +280,48 @@ async def get_session_review(db: AsyncSession, session_id: str, user: User) -> Q
 
 async def evaluate_answer(db: AsyncSession, question: Question, answer_data: Dict[str, Any]) -> bool:
     """Evaluate an answer based on question type."""
+    params = {"question_id": question.id}
+    
     if question.type == QuestionType.QCM:
         selected_option_ids = answer_data.get("selected_option_ids", [])
-        result = await db.execute(
-            select(QuestionOption).where(QuestionOption.question_id == question.id)
-        )
-        options = list(result.scalars().all())
-        
-        correct_ids = {opt.id for opt in options if opt.is_correct}
-        return set(selected_option_ids) == correct_ids
+        result = await db.execute(_CORRECT_OPTION_IDS_STMT, params)
+        return frozenset(selected_option_ids) == frozenset(result.scalars().all())
     
     elif question.type == QuestionType.VRAI_FAUX:
         selected_option_id = answer_data.get("selected_option_id")
-        result = await db.execute(
-            select(QuestionOption)
-            .where(QuestionOption.question_id == question.id, QuestionOption.is_correct == True)
-        )
-        correct_option = result.scalar_one_or_none()
-        return selected_option_id == correct_option.id if correct_option else False
+        result = await db.execute(_CORRECT_OPTION_IDS_STMT, params)
+        correct_option_id = result.scalar_one_or_none()
+        return selected_option_id == correct_option_id if correct_option_id else False
     
     elif question.type == QuestionType.MATCHING:
         pairs = answer_data.get("pairs", {})
-        result = await db.execute(
-            select(MatchingPair).where(MatchingPair.question_id == question.id)
-        )
-        correct_pairs = {pair.item_left: pair.item_right for pair in result.scalars().all()}
-        return pairs == correct_pairs
+        result = await db.execute(_MATCHING_PAIRS_STMT, params)
+        return pairs == dict(result.all())
     
     elif question.type == QuestionType.IMAGE:
         clicked = answer_data.get("clicked_coordinates")
         if clicked:
             # Check if click is within any correct zone's radius
             x, y = clicked.get("x", 0), clicked.get("y", 0)
-            result = await db.execute(
-                select(ImageZone).where(ImageZone.question_id == question.id)
-            )
-            zones = list(result.scalars().all())
-            for zone in zones:
-                dx = x - zone.x
-                dy = y - zone.y
-                distance = (dx * dx + dy * dy) ** 0.5
-                if distance <= zone.radius:
-                    return True
-            return False
+            return bool(await db.scalar(_CLICK_IN_ZONE_STMT, {**params, "x": x, "y": y}))
         else:
             # Fallback: check selected_zone_ids
             selected_zone_ids = answer_data.get("selected_zone_ids", [])
-            result = await db.execute(
-                select(ImageZone).where(ImageZone.question_id == question.id)
-            )
-            correct_zone_ids = {zone.id for zone in result.scalars().all()}
-            return set(selected_zone_ids) == correct_zone_ids
+            result = await db.execute(_IMAGE_ZONE_IDS_STMT, params)
+            return frozenset(selected_zone_ids) == frozenset(result.scalars().all())
     
     elif question.type == QuestionType.TEXT:
         user_answer = answer_data.get("text_answer", "").strip()
-        result = await db.execute(
-            select(TextConfig).where(TextConfig.question_id == question.id)
-        )
-        config = result.scalar_one_or_none()
+        result = await db.execute(_TEXT_CONFIG_STMT, params)
+        config = result.first()
         
         if not config:
             return False
         
-        expected = config.accepted_answer.strip()
+        accepted_answer, is_case_sensitive = config
+        expected = accepted_answer.strip()
         
-        if not config.is_case_sensitive:
+        if not is_case_sensitive:
             user_answer = user_answer.lower()
             expected = expected.lower()
         
@@ -295,73 +331,64 @@ async def evaluate_answer(db: AsyncSession, question: Question, answer_data: Dic
     return False
 
 
+def _insert_ignore_conflicts(db: AsyncSession, model, index_elements: List[str]):
+    """Build an INSERT ... ON CONFLICT DO NOTHING for the session's dialect."""
+    dialect_insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
 async def _complete_quiz(db: AsyncSession, quiz_id: str, student_id: str, classroom_id: str):
     """Auto-create CompletedQuiz and add questions to Leitner Box 1."""
     # Create CompletedQuiz if not exists
-    result = await db.execute(
-        select(CompletedQuiz)
-        .where(CompletedQuiz.student_id == student_id, CompletedQuiz.quiz_id == quiz_id)
+    await db.execute(
+        _insert_ignore_conflicts(db, CompletedQuiz, ["student_id", "quiz_id"]),
+        [{"student_id": student_id, "quiz_id": quiz_id}]
     )
-    if not result.scalar_one_or_none():
-        completed = CompletedQuiz(student_id=student_id, quiz_id=quiz_id)
-        db.add(completed)
-    
-    # Add all questions to Leitner Box 1 (if not already in higher boxes)
-    result = await db.execute(select(Question).where(Question.quiz_id == quiz_id))
-    questions = list(result.scalars().all())
     
-    for question in questions:
-        result = await db.execute(
-            select(LeitnerBox)
-            .where(
-                LeitnerBox.classroom_id == classroom_id,
-                LeitnerBox.student_id == student_id,
-                LeitnerBox.question_id == question.id
-            )
+    # Add all questions to Leitner Box 1; the unique index keeps existing boxes untouched
+    # (databases created before the index get it from upgrade_schema at startup)
+    result = await db.execute(select(Question.id).where(Question.quiz_id == quiz_id))
+    question_ids = list(result.scalars().all())
+    
+    if question_ids:
+        await db.execute(
+            _insert_ignore_conflicts(db, LeitnerBox, ["student_id", "classroom_id", "question_id"]),
+            [
+                {
+                    "classroom_id": classroom_id,
+                    "student_id": student_id,
+                    "question_id": question_id,
+                    "box_level": 1
+                }
+                for question_id in question_ids
+            ]
         )
-        if not result.scalar_one_or_none():
-            leitner_box = LeitnerBox(
-                classroom_id=classroom_id,
-                student_id=student_id,
-                question_id=question.id,
-                box_level=1
-            )
-            db.add(leitner_box)
     
     # Check if module is completed
-    result = await db.execute(select(Quiz).where(Quiz.id == quiz_id))
-    quiz = result.scalar_one_or_none()
+    module_id = await db.scalar(select(Quiz.module_id).where(Quiz.id == quiz_id))
     
-    if quiz:
-        await _check_module_completion(db, quiz.module_id, student_id)
+    if module_id:
+        await _check_module_completion(db, module_id, student_id)
     
     await db.commit()
 
 
 async def _check_module_completion(db: AsyncSession, module_id: str, student_id: str):
     """Check if module is completed and create CompletedModule."""
-    # Get all required quizzes in module
-    result = await db.execute(
-        select(Quiz)
-        .where(Quiz.module_id == module_id, Quiz.min_score_to_unlock_next > 0)
-    )
-    required_quizzes = list(result.scalars().all())
-    
-    # Check if all are completed
-    for quiz in required_quizzes:
-        result = await db.execute(
-            select(CompletedQuiz)
-            .where(CompletedQuiz.student_id == student_id, CompletedQuiz.quiz_id == quiz.id)
+    # Count required quizzes of the module the student has not completed yet
+    missing = await db.scalar(
+        select(func.count(Quiz.id))
+        .where(
+            Quiz.module_id == module_id,
+            Quiz.min_score_to_unlock_next > 0,
+            ~exists().where(CompletedQuiz.quiz_id == Quiz.id, CompletedQuiz.student_id == student_id)
         )
-        if not result.scalar_one_or_none():
-            return  # Not all required quizzes completed
+    )
+    if missing:
+        return  # Not all required quizzes completed
     
     # Create CompletedModule if not exists
-    result = await db.execute(
-        select(CompletedModule)
-        .where(CompletedModule.student_id == student_id, CompletedModule.module_id == module_id)
+    await db.execute(
+        _insert_ignore_conflicts(db, CompletedModule, ["student_id", "module_id"]),
+        [{"student_id": student_id, "module_id": module_id}]
     )
-    if not result.scalar_one_or_none():
-        completed = CompletedModule(student_id=student_id, module_id=module_id)
-        db.add(completed)
-        await db.commit()
@@ -1,7 +1,7 @@
 """Statistics service."""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, and_
 from fastapi import HTTPException, status
 
 from app.models.user import User
@@ -12,10 +12,26 @@ from app.models.leitner import LeitnerBox, LeitnerSession
 from app.models.module import Module
 from app.models.quiz import Quiz
 from app.services.classroom_service import is_classroom_member, is_classroom_teacher
+from app.core.cache import stats_cache
+
+
+def _leitner_distribution(rows) -> Tuple[Dict[int, int], float]:
+    """Zero-filled box distribution and weighted mastery from (box_level, count) rows, in one pass."""
+    distribution = dict.fromkeys(range(1, 6), 0)
+    total = weighted = 0
+    for box_level, count in rows:
+        distribution[box_level] = count
+        total += count
+        weighted += box_level * count
+    return distribution, (weighted / total if total else 0.0)
 
 
 async def get_student_stats(db: AsyncSession, user: User) -> Dict[str, Any]:
     """Get student statistics."""
+    cached = stats_cache.get(("student", user.id))
+    if cached is not None:
+        return cached
+    
     # Count completed quizzes
     result = await db.execute(
         select(func.count(CompletedQuiz.quiz_id))
@@ -42,23 +58,16 @@ async def get_student_stats(db: AsyncSession, user: User) -> Dict[str, Any]:
         .where(LeitnerBox.student_id == user.id)
         .group_by(LeitnerBox.box_level)
     )
-    leitner_distribution = {i: 0 for i in range(1, 6)}
-    for box_level, count in result.all():
-        leitner_distribution[box_level] = count
+    leitner_distribution, mastery_score = _leitner_distribution(result)
     
-    # Calculate Leitner mastery (weighted average)
-    total_questions = sum(leitner_distribution.values())
-    if total_questions > 0:
-        mastery_score = sum(box_level * count for box_level, count in leitner_distribution.items()) / total_questions
-    else:
-        mastery_score = 0.0
-    
-    return {
+    stats = {
         "completed_quizzes": completed_quizzes,
         "average_score": round(avg_score, 2),
         "leitner_distribution": leitner_distribution,
         "leitner_mastery": round(mastery_score, 2)
     }
+    stats_cache.set(("student", user.id), stats)
+    return stats
 
 
 async def get_leaderboard(
@@ -79,6 +88,25 @@ async def get_leaderboard(
     if not await is_classroom_member(db, classroom_id, user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
+    leaderboard = stats_cache.get(("leaderboard", classroom_id))
+    if leaderboard is None:
+        leaderboard = await _build_leaderboard(db, classroom_id)
+        stats_cache.set(("leaderboard", classroom_id), leaderboard)
+    
+    # Paginate
+    offset = (page - 1) * limit
+    paginated = leaderboard[offset:offset + limit]
+    
+    return {
+        "data": paginated,
+        "total": len(leaderboard),
+        "page": page,
+        "limit": limit
+    }
+
+
+async def _build_leaderboard(db: AsyncSession, classroom_id: str) -> List[Dict[str, Any]]:
+    """Compute the sorted leaderboard of a classroom."""
     # Get all students in classroom with their stats
     result = await db.execute(
         select(User.id, User.name, User.email)
@@ -87,55 +115,45 @@ async def get_leaderboard(
     )
     students = result.all()
     
-    leaderboard = []
-    for student_id, name, email in students:
-        # Count completed quizzes in this classroom
-        result = await db.execute(
-            select(func.count(CompletedQuiz.quiz_id))
-            .join(Quiz)
-            .join(Module)
-            .where(
-                CompletedQuiz.student_id == student_id,
-                Module.classroom_id == classroom_id
-            )
+    # Completed quizzes per student in this classroom, in one grouped query
+    result = await db.execute(
+        select(CompletedQuiz.student_id, func.count(CompletedQuiz.quiz_id))
+        .join(Quiz, Quiz.id == CompletedQuiz.quiz_id)
+        .join(Module, Module.id == Quiz.module_id)
+        .where(Module.classroom_id == classroom_id)
+        .group_by(CompletedQuiz.student_id)
+    )
+    completed_by_student = dict(result.all())
+    
+    # Average score per student in this classroom, in one grouped query
+    result = await db.execute(
+        select(
+            QuizSession.student_id,
+            func.avg(QuizSession.total_score * 20.0 / QuizSession.max_score)
         )
-        completed = result.scalar() or 0
-        
-        # Calculate average score for this classroom
-        result = await db.execute(
-            select(
-                func.avg(QuizSession.total_score * 20.0 / QuizSession.max_score)
-            )
-            .where(
-                QuizSession.student_id == student_id,
-                QuizSession.classroom_id == classroom_id,
-                QuizSession.status == SessionStatus.COMPLETED,
-                QuizSession.max_score > 0
-            )
+        .where(
+            QuizSession.classroom_id == classroom_id,
+            QuizSession.status == SessionStatus.COMPLETED,
+            QuizSession.max_score > 0
         )
-        avg_score = result.scalar() or 0.0
-        
+        .group_by(QuizSession.student_id)
+    )
+    avg_by_student = dict(result.all())
+    
+    leaderboard = []
+    for student_id, name, email in students:
+        avg_score = avg_by_student.get(student_id) or 0.0
         leaderboard.append({
             "student_id": student_id,
             "name": name,
             "email": email,
-            "completed_quizzes": completed,
+            "completed_quizzes": completed_by_student.get(student_id, 0),
             "average_score": round(avg_score, 2)
         })
     
     # Sort by completed quizzes desc, then by average score desc
     leaderboard.sort(key=lambda x: (-x["completed_quizzes"], -x["average_score"]))
-    
-    # Paginate
-    offset = (page - 1) * limit
-    paginated = leaderboard[offset:offset + limit]
-    
-    return {
-        "data": paginated,
-        "total": len(leaderboard),
-        "page": page,
-        "limit": limit
-    }
+    return leaderboard
 
 
 async def get_professor_dashboard(db: AsyncSession, classroom_id: str, user: User) -> Dict[str, Any]:
@@ -143,46 +161,54 @@ async def get_professor_dashboard(db: AsyncSession, classroom_id: str, user: Use
     if not await is_classroom_teacher(db, classroom_id, user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="INSUFFICIENT_PERMISSIONS")
     
-    # Get modules in classroom
-    result = await db.execute(
-        select(Module).where(Module.classroom_id == classroom_id)
-    )
-    modules = list(result.scalars().all())
+    cached = stats_cache.get(("dashboard", classroom_id))
+    if cached is not None:
+        return cached
     
-    module_stats = []
-    for module in modules:
-        # Get quizzes in module
-        result = await db.execute(
-            select(Quiz).where(Quiz.module_id == module.id)
+    # Average score per quiz; quizzes without completed sessions average to NULL
+    quiz_averages = (
+        select(
+            Quiz.id,
+            Quiz.module_id,
+            func.avg(QuizSession.total_score * 20.0 / QuizSession.max_score).label("average_score")
         )
-        quizzes = list(result.scalars().all())
-        
-        # Calculate average difficulty (based on average scores)
-        total_avg = 0
-        quiz_count = 0
-        
-        for quiz in quizzes:
-            result = await db.execute(
-                select(func.avg(QuizSession.total_score * 20.0 / QuizSession.max_score))
-                .where(
-                    QuizSession.quiz_id == quiz.id,
-                    QuizSession.status == SessionStatus.COMPLETED,
-                    QuizSession.max_score > 0
-                )
+        .join(Module, Module.id == Quiz.module_id)
+        .outerjoin(
+            QuizSession,
+            and_(
+                QuizSession.quiz_id == Quiz.id,
+                QuizSession.status == SessionStatus.COMPLETED,
+                QuizSession.max_score > 0
             )
-            avg = result.scalar()
-            if avg is not None:
-                total_avg += avg
-                quiz_count += 1
-        
-        avg_score = (total_avg / quiz_count) if quiz_count > 0 else 0
-        
-        module_stats.append({
-            "module_id": module.id,
-            "module_name": module.name,
-            "quiz_count": len(quizzes),
-            "average_score": round(avg_score, 2)
-        })
+        )
+        .where(Module.classroom_id == classroom_id)
+        .group_by(Quiz.id, Quiz.module_id)
+        .subquery()
+    )
+    
+    # Module stats in one grouped query: AVG skips NULLs, so a module averages its scored quizzes
+    result = await db.execute(
+        select(
+            Module.id,
+            Module.name,
+            func.count(quiz_averages.c.id),
+            func.avg(quiz_averages.c.average_score)
+        )
+        .outerjoin(quiz_averages, quiz_averages.c.module_id == Module.id)
+        .where(Module.classroom_id == classroom_id)
+        .group_by(Module.id, Module.name)
+        .order_by(Module.created_at)
+    )
+    
+    module_stats = [
+        {
+            "module_id": module_id,
+            "module_name": module_name,
+            "quiz_count": quiz_count,
+            "average_score": round(avg_score or 0, 2)
+        }
+        for module_id, module_name, quiz_count, avg_score in result.all()
+    ]
     
     # Get Leitner stats for classroom
     result = await db.execute(
@@ -190,9 +216,7 @@ async def get_professor_dashboard(db: AsyncSession, classroom_id: str, user: Use
         .where(LeitnerBox.classroom_id == classroom_id)
         .group_by(LeitnerBox.box_level)
     )
-    leitner_distribution = {i: 0 for i in range(1, 6)}
-    for box_level, count in result.all():
-        leitner_distribution[box_level] = count
+    leitner_distribution, avg_mastery = _leitner_distribution(result)
     
     # Count active students (students who have Leitner sessions)
     result = await db.execute(
@@ -201,14 +225,7 @@ async def get_professor_dashboard(db: AsyncSession, classroom_id: str, user: Use
     )
     active_students = result.scalar() or 0
     
-    # Calculate average mastery
-    total_questions = sum(leitner_distribution.values())
-    if total_questions > 0:
-        avg_mastery = sum(box_level * count for box_level, count in leitner_distribution.items()) / total_questions
-    else:
-        avg_mastery = 0.0
-    
-    return {
+    dashboard = {
         "module_stats": module_stats,
         "leitner_stats": {
             "distribution": leitner_distribution,
@@ -216,3 +233,5 @@ async def get_professor_dashboard(db: AsyncSession, classroom_id: str, user: Use
             "active_students": active_students
         }
     }
+    stats_cache.set(("dashboard", classroom_id), dashboard)
+    return dashboard
@@ -1,8 +1,11 @@
 """Seed database with test data."""
 import asyncio
+import uuid
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import AsyncSessionLocal, engine, Base
+from app.db.upgrade import upgrade_schema
 from app.models.user import User, Role, Level, StudentProfile, TeacherProfile
 from app.core.security import get_password_hash
 
@@ -10,74 +13,87 @@ from app.core.security import get_password_hash
 async def seed_database():
     """Seed the database with test users."""
     async with engine.begin() as conn:
-        # Create all tables
+        # Create all tables, then upgrade tables that already existed
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
     
     async with AsyncSessionLocal() as db:
-        # Test users as specified in the requirements
-        test_users = [
-            {
-                "email": "admin@univ-rennes.fr",
-                "password": "admin123",
-                "name": "Admin User",
-                "role": Role.ADMIN,
-            },
-            {
-                "email": "house@univ-rennes.fr",
-                "password": "prof123",
-                "name": "Dr. House",
-                "role": Role.TEACHER,
-                "department": "Anatomie",
-            },
-            {
-                "email": "wilson@univ-rennes.fr",
-                "password": "prof123",
-                "name": "Dr. Wilson",
-                "role": Role.TEACHER,
-                "department": "Anatomie",
-            },
-            {
-                "email": "marie.martin@univ-rennes.fr",
-                "password": "student123",
-                "name": "Marie Martin",
-                "role": Role.STUDENT,
-                "level": Level.L1,
-            },
-            {
-                "email": "jean.dupont@univ-rennes.fr",
-                "password": "student123",
-                "name": "Jean Dupont",
-                "role": Role.STUDENT,
-                "level": Level.L1,
-            },
-        ]
+        # One transaction for the whole seed: committed on success, rolled back on any error
+        async with db.begin():
+            # Already seeded: fetch a single id instead of loading a full User row
+            if (await db.execute(select(User.id).limit(1))).first() is not None:
+                print("✓ Database already seeded, skipping")
+                return
+            
+            # Test users as specified in the requirements
+            test_users = [
+                {
+                    "email": "admin@univ-rennes.fr",
+                    "password": "admin123",
+                    "name": "Admin User",
+                    "role": Role.ADMIN,
+                },
+                {
+                    "email": "house@univ-rennes.fr",
+                    "password": "prof123",
+                    "name": "Dr. House",
+                    "role": Role.TEACHER,
+                    "department": "Anatomie",
+                },
+                {
+                    "email": "wilson@univ-rennes.fr",
+                    "password": "prof123",
+                    "name": "Dr. Wilson",
+                    "role": Role.TEACHER,
+                    "department": "Anatomie",
+                },
+                {
+                    "email": "marie.martin@univ-rennes.fr",
+                    "password": "student123",
+                    "name": "Marie Martin",
+                    "role": Role.STUDENT,
+                    "level": Level.L1,
+                },
+                {
+                    "email": "jean.dupont@univ-rennes.fr",
+                    "password": "student123",
+                    "name": "Jean Dupont",
+                    "role": Role.STUDENT,
+                    "level": Level.L1,
+                },
+            ]
         
-        for user_data in test_users:
-            # Create user
-            user = User(
-                email=user_data["email"],
-                password=get_password_hash(user_data["password"]),
-                name=user_data["name"],
-                role=user_data["role"],
-            )
-            db.add(user)
-            await db.flush()  # Get the user ID
+            # Demo accounts share a password per role: hash each distinct one once, in worker threads
+            passwords = list({user_data["password"] for user_data in test_users})
+            hashed = dict(zip(passwords, await asyncio.gather(*(
+                asyncio.to_thread(get_password_hash, password) for password in passwords
+            ))))
+            hashes = [hashed[user_data["password"]] for user_data in test_users]
+        
+            # Plain rows with client-side ids: one executemany per table, no ORM bookkeeping
+            user_rows, student_profile_rows, teacher_profile_rows = [], [], []
+            for user_data, hashed_password in zip(test_users, hashes):
+                user_id = str(uuid.uuid4())
+                user_rows.append({
+                    "id": user_id,
+                    "email": user_data["email"],
+                    "password": hashed_password,
+                    "name": user_data["name"],
+                    "role": user_data["role"],
+                })
             
-            # Create profile based on role
-            if user_data["role"] == Role.STUDENT:
-                profile = StudentProfile(
-                    user_id=user.id,
-                    level=user_data["level"],
-                )
-                db.add(profile)
-            elif user_data["role"] == Role.TEACHER:
-                profile = TeacherProfile(
-                    user_id=user.id,
-                    faculty_department=user_data.get("department"),
-                )
-                db.add(profile)
+                # Create profile based on role
+                if user_data["role"] == Role.STUDENT:
+                    student_profile_rows.append({"user_id": user_id, "level": user_data["level"]})
+                elif user_data["role"] == Role.TEACHER:
+                    teacher_profile_rows.append({"user_id": user_id, "faculty_department": user_data.get("department")})
+        
+            await db.execute(insert(User), user_rows)
+            if student_profile_rows:
+                await db.execute(insert(StudentProfile), student_profile_rows)
+            if teacher_profile_rows:
+                await db.execute(insert(TeacherProfile), teacher_profile_rows)
         
-        await db.commit()
         print("✓ Database seeded successfully with test users:")
         for user_data in test_users:
             print(f"  - {user_data['email']} / {user_data['password']} ({user_data['role'].value})")
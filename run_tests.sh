@@ -68,6 +68,11 @@ case "${1:-all}" in
     pytest tests/test_media.py -v
     ;;
   
+  parallel)
+    echo -e "${GREEN}Running all tests across CPU cores...${NC}"
+    pytest tests/ -n auto
+    ;;
+  
   quick)
     echo -e "${GREEN}Running quick smoke tests (fail fast)...${NC}"
     pytest tests/ -x --maxfail=3
@@ -79,7 +84,7 @@ case "${1:-all}" in
     ;;
   
   *)
-    echo "Usage: $0 {all|coverage|auth|classrooms|modules|quizzes|questions|sessions|leitner|stats|media|quick|failed}"
+    echo "Usage: $0 {all|coverage|auth|classrooms|modules|quizzes|questions|sessions|leitner|stats|media|parallel|quick|failed}"
     echo ""
     echo "Options:"
     echo "  all         - Run all tests (default)"
@@ -93,6 +98,7 @@ case "${1:-all}" in
     echo "  leitner     - Run Leitner spaced repetition tests"
     echo "  stats       - Run statistics and progression tests"
     echo "  media       - Run media upload tests"
+    echo "  parallel    - Run all tests in parallel (pytest-xdist)"
     echo "  quick       - Quick smoke test (fail fast)"
     echo "  failed      - Re-run only failed tests"
     exit 1
@@ -669,3 +669,53 @@ def test_leitner_box_1_on_incorrect(client, student_token):
     # Would need to test questions from different boxes
     # and verify they all go to Box 1 on incorrect answer
     pass
+
+
+# =============================================================================
+# Schema upgrade of existing leitner_boxes tables
+# =============================================================================
+
+def test_upgrade_schema_adds_leitner_box_indexes(event_loop):
+    """
+    Test that upgrade_schema indexes a leitner_boxes table created before the indexes existed.
+    
+    Expected: duplicate boxes collapse to the most advanced one, both indexes
+    are created, and a second run is a no-op
+    """
+    from sqlalchemy import inspect, insert, select, text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.session import Base
+    from app.db.upgrade import upgrade_schema
+    from app.models.leitner import LeitnerBox
+    
+    async def _upgrade_legacy_table():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            async with engine.begin() as conn:
+                # Tables as create_all left them before the indexes were declared
+                await conn.run_sync(Base.metadata.create_all)
+                for index in LeitnerBox.__table__.indexes:
+                    await conn.execute(text(f"DROP INDEX {index.name}"))
+                
+                box = {"classroom_id": "c1", "student_id": "s1", "question_id": "q1"}
+                await conn.execute(insert(LeitnerBox), [
+                    {**box, "id": "box-a", "box_level": 1},
+                    {**box, "id": "box-b", "box_level": 3},
+                    {**box, "id": "box-c", "box_level": 2, "question_id": "q2"},
+                ])
+                
+                await conn.run_sync(upgrade_schema)
+                await conn.run_sync(upgrade_schema)
+                
+                index_names = await conn.run_sync(
+                    lambda sync_conn: {index["name"] for index in inspect(sync_conn).get_indexes("leitner_boxes")}
+                )
+                box_ids = (await conn.execute(select(LeitnerBox.id).order_by(LeitnerBox.id))).scalars().all()
+                return index_names, box_ids
+        finally:
+            await engine.dispose()
+    
+    index_names, box_ids = event_loop.run_until_complete(_upgrade_legacy_table())
+    
+    assert index_names == {index.name for index in LeitnerBox.__table__.indexes}
+    assert box_ids == ["box-b", "box-c"]
@@ -426,6 +426,58 @@ def test_create_image_invalid_media_id(client, prof_responsible_token, quiz_id):
     assert response.status_code == 404
 
 
+# =============================================================================
+# POST /api/quizzes/{qid}/questions/bulk
+# =============================================================================
+
+def test_create_questions_bulk(client, prof_responsible_token, quiz_id):
+    """
+    Test creating several questions of different types in one request.
+    
+    Expected: 201 Created, questions returned in payload order with their children
+    """
+    response = client.post(
+        f"/quizzes/{quiz_id}/questions/bulk",
+        headers={"Authorization": f"Bearer {prof_responsible_token}"},
+        json=[
+            {
+                "type": "QCM",
+                "contentText": "Quel os est le plus long ?",
+                "options": [
+                    {"textChoice": "Fémur", "isCorrect": True},
+                    {"textChoice": "Radius", "isCorrect": False}
+                ]
+            },
+            {
+                "type": "TEXT",
+                "contentText": "Nom de l'os du talon ?",
+                "textConfig": {"acceptedAnswer": "Calcanéus"}
+            }
+        ]
+    )
+    
+    assert response.status_code == 201
+    data = response.json()
+    assert [q["type"] for q in data] == ["QCM", "TEXT"]
+    assert len(data[0]["options"]) == 2
+    assert data[1]["textConfig"]["acceptedAnswer"] == "Calcanéus"
+
+
+def test_create_questions_bulk_as_student(client, student_token, quiz_id):
+    """
+    Test bulk-creating questions as student.
+    
+    Expected: 403 Forbidden
+    """
+    response = client.post(
+        f"/quizzes/{quiz_id}/questions/bulk",
+        headers={"Authorization": f"Bearer {student_token}"},
+        json=[{"type": "TEXT", "contentText": "?", "textConfig": {"acceptedAnswer": "x"}}]
+    )
+    
+    assert response.status_code == 403
+
+
 # =============================================================================
 # GET /api/quizzes/{qid}/questions
 # =============================================================================
@@ -444,6 +496,23 @@ def test_list_questions(client, prof_responsible_token, quiz_id):
     assert response.status_code == 200
 
 
+def test_list_questions_lite(client, prof_responsible_token, quiz_id, question_id):
+    """
+    Test listing questions without their children.
+    
+    Expected: 200 OK, questions without options
+    """
+    response = client.get(
+        f"/quizzes/{quiz_id}/questions?lite=true",
+        headers={"Authorization": f"Bearer {prof_responsible_token}"}
+    )
+    
+    assert response.status_code == 200
+    questions = response.json()
+    assert question_id in [q["id"] for q in questions]
+    assert all("options" not in q for q in questions)
+
+
 def test_list_questions_student_hides_answers(client, student_token, quiz_id):
     """
     Test that question list for students hides correct answers (anti-cheat).
@@ -519,6 +588,44 @@ def test_update_question(client, prof_responsible_token, question_id):
     assert response.json()["contentText"] == "Updated question text"
 
 
+def test_update_question_options(client, prof_responsible_token, question_id):
+    """
+    Test replacing the options of a QCM question.
+    
+    Expected: 200 OK, options match the new payload exactly
+    """
+    response = client.patch(
+        f"/questions/{question_id}",
+        headers={"Authorization": f"Bearer {prof_responsible_token}"},
+        json={"options": [
+            {"textChoice": "Paris", "isCorrect": True},
+            {"textChoice": "Lyon", "isCorrect": False}
+        ]}
+    )
+    
+    assert response.status_code == 200
+    options = sorted(response.json()["options"], key=lambda o: o["displayOrder"])
+    assert [(o["textChoice"], o["isCorrect"], o["displayOrder"]) for o in options] == [
+        ("Paris", True, 0),
+        ("Lyon", False, 1)
+    ]
+
+
+def test_update_question_unknown_media(client, prof_responsible_token, question_id):
+    """
+    Test updating a question with a media ID that does not exist.
+    
+    Expected: 404 Not Found
+    """
+    response = client.patch(
+        f"/questions/{question_id}",
+        headers={"Authorization": f"Bearer {prof_responsible_token}"},
+        json={"mediaId": "non-existent-media-id"}
+    )
+    
+    assert response.status_code == 404
+
+
 def test_update_question_as_student(client, student_token, question_id):
     """
     Test updating question as student.
@@ -721,6 +721,27 @@ def test_review_session_shows_student_answers(client, student_token):
         # Should show what student answered and whether it was correct
 
 
+def test_review_session_answer_data_is_object(client, student_token, session_id, question_id):
+    """
+    Test that review returns submitted answer data as a JSON object.
+    
+    Expected: 200 OK, answerData echoes the submitted selection
+    """
+    headers = {"Authorization": f"Bearer {student_token}"}
+    client.post(
+        f"/sessions/{session_id}/submit-answer",
+        headers=headers,
+        json={"questionId": question_id, "selectedOptionId": "correct-option-id"}
+    )
+    client.post(f"/sessions/{session_id}/finish", headers=headers)
+    
+    response = client.get(f"/sessions/{session_id}/review", headers=headers)
+    
+    assert response.status_code == 200
+    answers = response.json()["answers"]
+    assert answers[0]["answerData"] == {"selected_option_ids": ["correct-option-id"]}
+
+
 def test_review_session_not_found(client, student_token):
     """
     Test reviewing non-existent session.
@@ -749,3 +770,49 @@ def test_review_session_wrong_student(client, student2_token):
     )
     
     assert response.status_code == 403
+
+
+# =============================================================================
+# Quiz completion on databases created before the Leitner box indexes
+# =============================================================================
+
+def test_complete_quiz_on_upgraded_legacy_database(event_loop):
+    """
+    Test that passing a quiz works on a leitner_boxes table created without its unique index.
+    
+    Expected: once upgrade_schema has run, the ON CONFLICT DO NOTHING insert of
+    Leitner boxes succeeds and completing the quiz twice keeps one box per question
+    """
+    from sqlalchemy import func, insert, select, text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.db.session import Base
+    from app.db.upgrade import upgrade_schema
+    from app.models.leitner import LeitnerBox
+    from app.models.question import Question, QuestionType
+    from app.models.quiz import Quiz
+    from app.services.session_service import _complete_quiz
+    
+    async def _complete_twice():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            async with engine.begin() as conn:
+                # Tables as create_all left them before the indexes were declared
+                await conn.run_sync(Base.metadata.create_all)
+                for index in LeitnerBox.__table__.indexes:
+                    await conn.execute(text(f"DROP INDEX {index.name}"))
+                await conn.execute(insert(Quiz), [{"id": "quiz-1", "module_id": "module-1", "title": "Legacy Quiz"}])
+                await conn.execute(insert(Question), [
+                    {"id": f"question-{i}", "quiz_id": "quiz-1", "type": QuestionType.QCM, "content_text": f"Q{i}?"}
+                    for i in range(3)
+                ])
+                
+                await conn.run_sync(upgrade_schema)
+            
+            async with AsyncSession(engine) as db:
+                await _complete_quiz(db, "quiz-1", "student-1", "classroom-1")
+                await _complete_quiz(db, "quiz-1", "student-1", "classroom-1")
+                return await db.scalar(select(func.count(LeitnerBox.id)))
+        finally:
+            await engine.dispose()
+    
+    assert event_loop.run_until_complete(_complete_twice()) == 3
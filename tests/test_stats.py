@@ -213,6 +213,28 @@ def test_leaderboard_pagination(client, student_token, classroom_id):
         assert "totalPages" in data["pagination"]
 
 
+def test_leaderboard_reflects_removed_student(client, student_token, prof_responsible_token, classroom_id):
+    """
+    Test a cached leaderboard is refreshed after a student leaves the classroom.
+    
+    Expected: 200 OK, total decreases by one
+    """
+    headers = {"Authorization": f"Bearer {student_token}"}
+    before = client.get(f"/stats/leaderboard/{classroom_id}", headers=headers)
+    assert before.status_code == 200
+    
+    response = client.delete(
+        f"/classrooms/{classroom_id}/students/student-to-remove-id",
+        headers={"Authorization": f"Bearer {prof_responsible_token}"}
+    )
+    assert response.status_code == 204
+    
+    after = client.get(f"/stats/leaderboard/{classroom_id}", headers=headers)
+    assert after.status_code == 200
+    assert after.json()["total"] == before.json()["total"] - 1
+    assert all(entry["studentId"] != "student-to-remove-id" for entry in after.json()["data"])
+
+
 def test_leaderboard_not_member(client, student_token):
     """
     Test accessing leaderboard for classroom where not a member.